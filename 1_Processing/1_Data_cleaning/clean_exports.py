@@ -0,0 +1,266 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import datacleaner_instagram
+import datacleaner_tiktok
+from ndjson_stream import all_of
+from dedup_index import DedupIndex, SnapshotFilter, SnapshotRecorder, export_scraped_at
+from ingest_manifest import (
+    append_rows, load_manifest, manifest_from_clean_csv, manifest_path, new_manifest, record_run,
+    replace_rows, save_manifest, source_signature,
+)
+
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(datacleaner_tiktok.PROJECT_ROOT / "1_Processing"))
+from clean_store import HAVE_PARQUET, append_partition, party_of, sync_party, write_partition  # noqa: E402
+from snapshot_store import COUNTERS, SnapshotStore  # noqa: E402
+
+
+# Shared cleaning command for both platforms.
+# Raw Zeeschuimer exports are grouped by account (<prefix>_<Platform>_...)
+# and each account is cleaned by its platform adapter (see ADAPTER in
+# datacleaner_*.py) in a process pool, largest accounts first.
+#
+# Runs are incremental: a per-account manifest (ingest_manifest.py) lists
+# the exports already ingested and the post ids already in
+# <clean_dir>/<prefix>__cleaned.csv. Unchanged exports are skipped, and of a
+# new export only posts with a new id or a newer engagement snapshot are
+# prepared (dedup_index.py), so a re-scrape costs time in proportion to what
+# changed. New posts are appended, newer snapshots replace their row.
+# Every snapshot read, stale or not, is also kept in the engagement history
+# (1_Processing/snapshot_store.py).
+# --full rebuilds every clean file from all raw exports.
+# Every clean CSV is mirrored as a typed Parquet partition of the clean
+# store (A_Data/0_STORE, see 1_Processing/clean_store.py) if pyarrow is
+# installed.
+#
+#   python clean_exports.py --platform all --workers 4
+
+DATE_A = "2025-03-09"
+DATE_B = "2025-10-12"
+
+PLATFORMS = {
+    adapter["name"]: adapter
+    for adapter in (datacleaner_instagram.ADAPTER, datacleaner_tiktok.ADAPTER)
+}
+
+
+def account_name(adapter: dict, export_name: str) -> str:
+    """'3_FDP_Tiktok_zeeschuimer-...ndjson' -> '3_FDP_'"""
+    return export_name.split(adapter["export_tag"])[0]
+
+
+def clean_filename(account: str) -> str:
+    return account + "_cleaned.csv"
+
+
+def snapshot_counters(platform: str) -> dict:
+    return {name: field for name, (field, _) in COUNTERS[platform].items()}
+
+
+def prepare_export(adapter: dict, raw_path, date_a: str, date_b: str, record_filter=None) -> pd.DataFrame:
+    """
+    One raw export through its platform adapter: prep reads the adapter's
+    columns in the date window, then the post URL column is added if the
+    platform builds one (TikTok; Instagram exports carry theirs).
+    """
+    df = adapter["prep"](raw_path, date_a, date_b, record_filter=record_filter, columns=adapter["columns"])
+    if adapter["post_url"] is not None and df is not None and not df.empty:
+        df[adapter["url_column"]] = adapter["post_url"](df)
+    return df
+
+
+def clean_account(platform: str, account: str, export_names, date_a: str = DATE_A, date_b: str = DATE_B,
+                  full: bool = False) -> dict:
+    """Ingest the new exports of one account into its clean CSV; returns a small timing record."""
+    adapter = PLATFORMS[platform]
+    start = time.perf_counter()
+    clean_path = adapter["clean_dir"] / clean_filename(account)
+    manifest_file = manifest_path(adapter["clean_dir"], account)
+    id_field = adapter["id_field"]
+    index = DedupIndex(adapter["clean_dir"])
+
+    manifest = None if full else load_manifest(manifest_file)
+    if manifest is None:
+        manifest = (
+            new_manifest(account) if full
+            else manifest_from_clean_csv(account, clean_path, id_field, adapter["timestamp_field"])
+        )
+    if full:
+        index.drop_account(account)
+    stored = set(manifest["ids"])
+    known = index.load(account)
+
+    # posts of a clean CSV from before the index: their snapshot is the newest export seen
+    unindexed = [post_id for post_id in stored if post_id not in known]
+    if unindexed:
+        bootstrap = max((export_scraped_at(n) or 0.0) for n in (manifest["sources"] or export_names))
+        index.upsert(account, dict.fromkeys(unindexed, bootstrap))
+        known.update(dict.fromkeys(unindexed, bootstrap))
+
+    deltas, ingested, units, duplicates = [], [], {}, 0
+    for name in export_names:  # oldest export first
+        raw_path = adapter["raw_dir"] / name
+        signature = source_signature(raw_path)
+        if manifest["sources"].get(name) == signature:
+            continue
+        export_time = export_scraped_at(name)
+        recorder = SnapshotRecorder(id_field, snapshot_counters(platform), export_time)
+        snapshots = SnapshotFilter(id_field, known, export_time)
+        df = prepare_export(adapter, raw_path, date_a, date_b, record_filter=all_of(recorder, snapshots))
+        duplicates += snapshots.skipped
+        with SnapshotStore() as history:
+            history.append(platform, recorder.rows)
+        for unit, count in (df.attrs.get("timestamp_units", {}) if df is not None else {}).items():
+            units[unit] = units.get(unit, 0) + count
+        if df is not None and not df.empty:
+            # prep keeps the row labels of the stream, i.e. the order the filter accepted them in
+            df["_scraped_at"] = [snapshots.scraped_at[i] for i in df.index]
+            df = df.sort_values("_scraped_at", kind="stable").drop_duplicates(id_field, keep="last")
+            known.update(zip(df[id_field].astype(str), df["_scraped_at"]))
+            deltas.append(df)
+        manifest["sources"][name] = signature
+        ingested.append(name)
+
+    delta = pd.concat(deltas, ignore_index=True) if deltas else pd.DataFrame()
+    updated, added = [], []
+    saved = None
+    if not delta.empty:
+        delta = delta.drop_duplicates(id_field, keep="last")
+        snapshot_times = dict(zip(delta[id_field].astype(str), delta.pop("_scraped_at")))
+        is_update = delta[id_field].astype(str).isin(stored)
+        updated = delta.loc[is_update, id_field].astype(str).tolist()
+        added = delta.loc[~is_update, id_field].astype(str).tolist()
+        saved = clean_path
+        if full:
+            delta.to_csv(clean_path, index=False)
+            write_partition(delta, platform, party_of(clean_path))
+        else:
+            if updated:
+                replace_rows(clean_path, delta[is_update], id_field)
+            if added:
+                append_rows(clean_path, delta[~is_update])
+            if updated:
+                sync_party(platform, party_of(clean_path))
+            else:
+                append_partition(delta, platform, party_of(clean_path))
+        index.upsert(account, snapshot_times)
+    index.close()
+
+    if ingested or full:
+        stamps = delta[adapter["timestamp_field"]] if not delta.empty else []
+        record_run(manifest, ingested, added, stamps, updated)
+        save_manifest(manifest_file, manifest)
+
+    return {
+        "platform": platform,
+        "account": account,
+        "exports": len(export_names),
+        "ingested": len(ingested),
+        "rows": len(added),
+        "updated": len(updated),
+        "duplicates": duplicates,
+        "max_timestamp": manifest["max_timestamp"],
+        "timestamp_units": units,
+        "seconds": time.perf_counter() - start,
+        "saved": saved,
+    }
+
+
+def backfill_snapshots(platforms, date_a: str = DATE_A, date_b: str = DATE_B):
+    """Record the engagement snapshots of every raw export (e.g. ingested before the store existed)."""
+    for platform in platforms:
+        adapter = PLATFORMS[platform]
+        added = 0
+        with SnapshotStore() as history:
+            for names in list_accounts(adapter).values():
+                for name in names:
+                    recorder = SnapshotRecorder(adapter["id_field"], snapshot_counters(platform), export_scraped_at(name))
+                    prepare_export(adapter, adapter["raw_dir"] / name, date_a, date_b, record_filter=recorder)
+                    added += history.append(platform, recorder.rows)
+        print(f"{platform}: {added} new engagement snapshots")
+
+
+def list_accounts(adapter: dict) -> dict:
+    """{account: [raw export names, oldest first]} of a platform."""
+    accounts = {}
+    for f in sorted(os.listdir(adapter["raw_dir"])):
+        name = os.fsdecode(f)
+        if name.endswith(".ndjson"):
+            accounts.setdefault(account_name(adapter, name), []).append(name)
+    return accounts
+
+
+def clean_platforms(platforms, workers: int = 1, date_a: str = DATE_A, date_b: str = DATE_B,
+                    full: bool = False) -> list:
+    jobs = []
+    for platform in platforms:
+        adapter = PLATFORMS[platform]
+        os.makedirs(adapter["clean_dir"], exist_ok=True)
+        for account, names in list_accounts(adapter).items():
+            size = sum((adapter["raw_dir"] / n).stat().st_size for n in names)
+            jobs.append((size, platform, account, names))
+    jobs.sort(key=lambda job: job[0], reverse=True)
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [clean_account(p, account, names, date_a, date_b, full) for _, p, account, names in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            futures = [
+                pool.submit(clean_account, p, account, names, date_a, date_b, full)
+                for _, p, account, names in jobs
+            ]
+            results = [f.result() for f in futures]
+    wall = time.perf_counter() - start
+
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        label = f"{r['platform']:<9} {r['account']:<16}"
+        if r["ingested"] == 0:
+            print(f"{label} up to date ({r['exports']} exports already ingested)")
+        elif r["saved"] is None:
+            print(f"{label} no new posts in {r['ingested']} new exports, nothing saved.")
+        else:
+            units = ", ".join(f"{unit}={count}" for unit, count in r["timestamp_units"].items())
+            print(f"{label} {r['seconds']:6.2f}s {r['rows']:6d} new, {r['updated']} updated, "
+                  f"{r['duplicates']} duplicates skipped from {r['ingested']} exports "
+                  f"(newest post {r['max_timestamp']}; timestamps {units})")
+    busy = sum(r["seconds"] for r in results)
+    print(f"{len(results)} accounts in {wall:.2f}s wall ({busy:.2f}s of per-account work)")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean raw Zeeschuimer exports.")
+    parser.add_argument("--platform", choices=[*PLATFORMS, "all"], default="all")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="number of worker processes (1 = serial, 0 = all cores)",
+    )
+    parser.add_argument("--date-from", default=DATE_A)
+    parser.add_argument("--date-to", default=DATE_B)
+    parser.add_argument("--full", action="store_true", help="ignore manifests and rebuild every clean file")
+    parser.add_argument(
+        "--backfill-snapshots", action="store_true",
+        help="only record the engagement snapshots of all raw exports in the snapshot store",
+    )
+    args = parser.parse_args(argv)
+
+    platforms = list(PLATFORMS) if args.platform == "all" else [args.platform]
+    if args.backfill_snapshots:
+        backfill_snapshots(platforms, date_a=args.date_from, date_b=args.date_to)
+        return
+    if not HAVE_PARQUET:
+        print("[WARN] pyarrow not installed: writing the clean CSVs only, no columnar store.")
+    clean_platforms(platforms, workers=args.workers, date_a=args.date_from, date_b=args.date_to,
+                    full=args.full)
+    print("✅ All done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,56 @@
-import ndjson
 import pandas as pd
-from pandas import json_normalize
-import os
 import re
 from pathlib import Path
 
+from ndjson_stream import all_of, epoch_window_filter, read_ndjson_columns
+from timestamps import decode_timestamps
 
-def prepinstagram_through_user(file_name, date_a, date_b):
-    # Load NDJSON file
-    with open(file_name, 'r') as f:
-        data = ndjson.load(f)
-
-    # Flatten nested JSON
-    df_flat = json_normalize(data)
-
-    # Adjust columns to Instagram structure (you may adapt based on your actual schema)
-    columns_to_select = [
-        'source_platform',
-        'source_platform_url',
-        'user.username',
-        'data.id',
-        'data.caption.text',          # text of the post
-        'data.caption.created_at',    # post creation time
-        'data.media_type',            # image, video, carousel
-        'data.permalink',             # full URL to post
-        'data.like_count',
-        'data.comment_count',
-        'data.ig_play_count',
-        'data.username',
-        'data.media_url',             # direct media link
-        'data.children.data',         # if carousel
-    ]
-
-    # Filter existing columns
-    available_cols = [c for c in columns_to_select if c in df_flat.columns]
-    df_small = df_flat.loc[:, available_cols]
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent  # adjusted to reach the root directory
+
+# Adjust columns to Instagram structure (you may adapt based on your actual schema)
+COLUMNS = [
+    'source_platform',
+    'source_platform_url',
+    'user.username',
+    'data.id',
+    'data.caption.text',          # text of the post
+    'data.caption.created_at',    # post creation time
+    'data.media_type',            # image, video, carousel
+    'data.permalink',             # full URL to post
+    'data.like_count',
+    'data.comment_count',
+    'data.ig_play_count',
+    'data.username',
+    'data.media_url',             # direct media link
+    'data.children.data',         # if carousel
+]
+TIMESTAMP_FIELD = 'data.caption.created_at'
+TEXT_COLUMN = 'data.caption.text'
+ID_FIELD = 'data.id'
+
+
+def prepinstagram_through_user(file_name, date_a, date_b, record_filter=None, columns=COLUMNS):
+    # Date window (UTC-aware; include whole end day if no time given)
+    date_a = pd.to_datetime(date_a, utc=True, errors="coerce")
+    date_b = pd.to_datetime(date_b, utc=True, errors="coerce")
+    if pd.notna(date_b) and date_b.time() == pd.Timestamp(0, tz="UTC").time():
+        date_b = date_b + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    # Stream the NDJSON file, keeping only the existing selected columns.
+    # Records with a numeric created_at outside the window are dropped while
+    # reading; string timestamps are decided by the full conversion below.
+    keep = None
+    if pd.notna(date_a) and pd.notna(date_b):
+        keep = epoch_window_filter(TIMESTAMP_FIELD, date_a, date_b, keep_non_numeric=True)
+    # extra per-record filter of the caller (e.g. dedup of overlapping exports), applied last
+    keep = all_of(keep, record_filter)
+    df_small = read_ndjson_columns(file_name, columns, keep=keep)
+    if df_small.empty:
+        return df_small
 
     # Convert timestamp to datetime
+    units = {}
     if (
             "data.caption.created_at" in df_small.columns
             or "data.taken_at" in df_small.columns
@@ -51,84 +65,47 @@ def prepinstagram_through_user(file_name, date_a, date_b):
         merged = cap.combine_first(taken).combine_first(coll)
         df_small["data.caption.created_at"] = merged
 
-        raw_series = df_small["data.caption.created_at"]
-
-        # 1) Numeric epochs FIRST (handles floats like 1.757675626e9)
-        numeric = pd.to_numeric(raw_series, errors="coerce")
-        dt_col = pd.Series(pd.NaT, index=raw_series.index, dtype="datetime64[ns, UTC]")
-
-        s_mask = numeric.notna() & (numeric < 1e11)  # seconds
-        ms_mask = numeric.notna() & (numeric >= 1e11) & (numeric < 1e14)  # ms
-        us_mask = numeric.notna() & (numeric >= 1e14) & (numeric < 1e17)  # µs
-        ns_mask = numeric.notna() & (numeric >= 1e17)  # ns
-
-        if s_mask.any():
-            dt_col.loc[s_mask] = pd.to_datetime(numeric[s_mask], unit="s", utc=True, errors="coerce")
-        if ms_mask.any():
-            dt_col.loc[ms_mask] = pd.to_datetime(numeric[ms_mask], unit="ms", utc=True, errors="coerce")
-        if us_mask.any():
-            dt_col.loc[us_mask] = pd.to_datetime(numeric[us_mask], unit="us", utc=True, errors="coerce")
-        if ns_mask.any():
-            dt_col.loc[ns_mask] = pd.to_datetime(numeric[ns_mask], unit="ns", utc=True, errors="coerce")
-
-        # 2) Remaining strings (ISO first, then flexible)
-        still_na = dt_col.isna()
-        if still_na.any():
-            raw_str = raw_series.astype("string").str.strip()
-            is_digits = raw_str.str.fullmatch(r"\d+")
-            iso_try = pd.to_datetime(raw_str.where(~is_digits, None), errors="coerce", utc=True, format="ISO8601")
-            dt_col.loc[still_na & iso_try.notna()] = iso_try[still_na & iso_try.notna()]
-            need_fallback = still_na & ~is_digits & raw_str.notna() & (raw_str != "")
-            if need_fallback.any():
-                dt_col.loc[need_fallback] = pd.to_datetime(raw_str[need_fallback], errors="coerce", utc=True)
-
+        # 1) epochs (s/ms/us/ns by magnitude) and ISO/other strings, all to UTC
+        dt_col, units = decode_timestamps(df_small["data.caption.created_at"])
         df_small["data.caption.created_at"] = dt_col
 
-        # Date filter (UTC-aware; include whole end day if no time given)
-        date_a = pd.to_datetime(date_a, utc=True, errors="coerce")
-        date_b = pd.to_datetime(date_b, utc=True, errors="coerce")
-        if pd.notna(date_b) and date_b.time() == pd.Timestamp(0, tz="UTC").time():
-            date_b = date_b + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
-
+        # Date filter
         df_small = df_small[
             (df_small["data.caption.created_at"] >= date_a) &
             (df_small["data.caption.created_at"] <= date_b)
             ]
 
-    return df_small
-
-
-### Clean files
-
-PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent  # adjusted to reach the root directory
-
-raw_dir = PROJECT_ROOT / "A_Data" / "2_Instagram" / "1_RAW"
-clean_dir = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN"
-
-os.makedirs(clean_dir, exist_ok=True)
-
-for file in os.listdir(raw_dir):
-    filename = os.fsdecode(file)
-    file_path = os.path.join(raw_dir, filename)
-
-    print(f"Processing {filename}...")
-
-    return_df = prepinstagram_through_user(file_path, "2025-03-09", "2025-10-12")
-
-    # If nothing survived the filter, skip writing an empty CSV
-    if return_df is None or return_df.empty:
-        print(f"[WARN] No rows after filtering for {filename}. Skipping save.")
-        continue
-
     # Clean only the caption text to avoid multi-line CSV rows
-    if "data.caption.text" in return_df.columns:
-        return_df["data.caption.text"] = (
-            return_df["data.caption.text"]
+    if TEXT_COLUMN in df_small.columns and not df_small.empty:
+        df_small[TEXT_COLUMN] = (
+            df_small[TEXT_COLUMN]
             .astype(str)
             .apply(lambda x: re.sub(r'[\r\n]+', ' ', x))
         )
 
-    save_path = os.path.join(clean_dir, filename.split('Instagram')[0] + "_cleaned.csv")
-    return_df.to_csv(save_path, index=False)
+    # decoded timestamps per unit/format, reported by the cleaning driver
+    df_small.attrs["timestamp_units"] = units
+    return df_small
+
+
+### Clean files
 
-print("✅ All done!")
+# Platform adapter for the shared cleaning driver (clean_exports.py).
+# Instagram exports already carry the post URL in source_platform_url.
+ADAPTER = {
+    "name": "instagram",
+    "raw_dir": PROJECT_ROOT / "A_Data" / "2_Instagram" / "1_RAW",
+    "clean_dir": PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN",
+    "export_tag": "Instagram",     # '3_FDP_Instagram_zeeschuimer-...' -> '3_FDP__cleaned.csv'
+    "columns": COLUMNS,             # fields read from every record
+    "id_field": ID_FIELD,
+    "timestamp_field": TIMESTAMP_FIELD,
+    "url_column": None,
+    "post_url": None,
+    "prep": prepinstagram_through_user,
+}
+
+
+if __name__ == "__main__":
+    from clean_exports import main
+    main(["--platform", "instagram"])
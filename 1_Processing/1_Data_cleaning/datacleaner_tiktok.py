@@ -1,55 +1,66 @@
-import ndjson
 import pandas as pd
-from pandas import json_normalize
-import os
-import re
 from pathlib import Path
 
+from ndjson_stream import all_of, epoch_window_filter, read_ndjson_columns
+from timestamps import decode_timestamps
 
-def preptiktok_through_user(file_name, date_a, date_b):
-    with open(file_name, 'r') as f:
-        data = ndjson.load(f)
 
-    df_flat = json_normalize(data)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent  # adjusted to reach the root directory
 
-    columns_to_select = [
-        'source_platform', 'source_platform_url', 'data.id', 'data.desc',
-        'data.createTime', 'data.stats.collectCount', 'data.stats.commentCount',
-        'data.stats.diggCount', 'data.stats.playCount', 'data.stats.shareCount',
-        'data.author.nickname', 'data.author.id', 'data.duetDisplay',
-        'data.duetEnabled', 'data.author.uniqueId'
-    ]
+COLUMNS = [
+    'source_platform', 'source_platform_url', 'data.id', 'data.desc',
+    'data.createTime', 'data.stats.collectCount', 'data.stats.commentCount',
+    'data.stats.diggCount', 'data.stats.playCount', 'data.stats.shareCount',
+    'data.author.nickname', 'data.author.id', 'data.duetDisplay',
+    'data.duetEnabled', 'data.author.uniqueId'
+]
+TIMESTAMP_FIELD = 'data.createTime'
+ID_FIELD = 'data.id'
 
-    df_small = df_flat.loc[:, columns_to_select]
-    df_small.loc[:, 'video_url'] = (
-        "https://www.tiktok.com/@" + df_small['data.author.uniqueId'] + "/video/" + df_small['data.id']
-    )
 
-    df_small['data.createTime'] = pd.to_datetime(df_small['data.createTime'], unit='s')
-    date_a = pd.to_datetime(date_a)
-    date_b = pd.to_datetime(date_b)
-    df_small = df_small[(df_small['data.createTime'] >= date_a) & (df_small['data.createTime'] <= date_b)]
-
-    return df_small
+def tiktok_video_url(df: pd.DataFrame) -> pd.Series:
+    return "https://www.tiktok.com/@" + df['data.author.uniqueId'] + "/video/" + df['data.id']
 
 
-### Clean files
-PROJECT_ROOT = Path(__file__).resolve().parent.parent  # adjust .parent/.parent as needed
+def preptiktok_through_user(file_name, date_a, date_b, record_filter=None, columns=COLUMNS):
+    # createTime is a UTC epoch: compare in UTC like the Instagram cleaner
+    date_a = pd.to_datetime(date_a, utc=True)
+    date_b = pd.to_datetime(date_b, utc=True)
 
-raw_dir = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "1_RAW"
-clean_dir = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "1_CLEAN"
+    # stream the export, dropping posts outside the date window while reading
+    keep = epoch_window_filter(TIMESTAMP_FIELD, date_a, date_b)
+    # extra per-record filter of the caller (e.g. dedup of overlapping exports), applied last
+    keep = all_of(keep, record_filter)
+    df_small = read_ndjson_columns(file_name, columns, keep=keep, require_all=True)
+    if df_small.empty:
+        return df_small
 
-os.makedirs(clean_dir, exist_ok=True)
+    df_small[TIMESTAMP_FIELD], units = decode_timestamps(df_small[TIMESTAMP_FIELD])
+    df_small = df_small[(df_small[TIMESTAMP_FIELD] >= date_a) & (df_small[TIMESTAMP_FIELD] <= date_b)]
 
-for file in os.listdir(raw_dir):
-    filename = os.fsdecode(file)
-    file_path = os.path.join(raw_dir, filename)
+    # decoded timestamps per unit/format, reported by the cleaning driver
+    df_small.attrs["timestamp_units"] = units
 
-    print(f"Processing {filename}...")
+    return df_small
 
-    return_df = preptiktok_through_user(file_path, "2025-03-09", "2025-10-12")
 
-    save_path = os.path.join(clean_dir, filename.split('Tiktok')[0] + "_cleaned.csv")
-    return_df.to_csv(save_path, index=False)
+### Clean files
 
-print("✅ All done!")
+# Platform adapter for the shared cleaning driver (clean_exports.py).
+ADAPTER = {
+    "name": "tiktok",
+    "raw_dir": PROJECT_ROOT / "A_Data" / "1_Tiktok" / "1_RAW",
+    "clean_dir": PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN",
+    "export_tag": "Tiktok",        # '3_FDP_Tiktok_zeeschuimer-...' -> '3_FDP__cleaned.csv'
+    "columns": COLUMNS,             # fields read from every record
+    "id_field": ID_FIELD,
+    "timestamp_field": TIMESTAMP_FIELD,
+    "url_column": "video_url",      # added by the driver from post_url(df)
+    "post_url": tiktok_video_url,
+    "prep": preptiktok_through_user,
+}
+
+
+if __name__ == "__main__":
+    from clean_exports import main
+    main(["--platform", "tiktok"])
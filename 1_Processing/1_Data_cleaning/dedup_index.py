@@ -0,0 +1,141 @@
+import re
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ingest_manifest import MANIFEST_DIR_NAME
+from ndjson_stream import _MISSING, epoch_seconds, get_path
+
+
+# Record-level deduplication across overlapping exports.
+# A platform-wide SQLite index (<clean_dir>/_manifest/dedup_index.sqlite)
+# holds, per account and post id of its clean CSV, the scrape time of the
+# stored snapshot. Entries are keyed by (account, post id): a post several
+# party accounts publish together (a collab) stays in every account's file,
+# only repeated scrapes of the same account's post are deduplicated. The
+# account's entries are loaded into a dict once per account run, so each
+# record is checked in O(1) while streaming: a post already stored with the
+# same or a newer snapshot is dropped before any column is built, a newer
+# snapshot of a stored post replaces its row.
+#
+# Scrape time of a record: its timestamp_collected (Zeeschuimer, epoch ms),
+# else the export timestamp in the file name
+# ('..._zeeschuimer-export-tiktok.com-2025-10-13T093404.ndjson', UTC).
+
+INDEX_FILE_NAME = "dedup_index.sqlite"
+COLLECTED_FIELD = "timestamp_collected"
+
+_EXPORT_TIME = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{6})")
+
+
+def export_scraped_at(export_name: str):
+    """Export time from a Zeeschuimer file name, as epoch seconds (UTC); None if absent."""
+    match = _EXPORT_TIME.search(export_name)
+    if match is None:
+        return None
+    stamp = datetime.strptime(match.group(1), "%Y-%m-%dT%H%M%S").replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+class DedupIndex:
+    """(account, post id) -> scraped_at for one platform, one file for all accounts."""
+
+    def __init__(self, clean_dir: Path):
+        self.path = Path(clean_dir) / MANIFEST_DIR_NAME / INDEX_FILE_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # accounts are cleaned in parallel processes: wait for the write lock
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS account_posts (
+                account    TEXT NOT NULL,
+                post_id    TEXT NOT NULL,
+                scraped_at REAL NOT NULL,
+                PRIMARY KEY (account, post_id)
+            )
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def load(self, account: str) -> dict:
+        """{post id: scraped_at} of one account."""
+        return dict(self.conn.execute("SELECT post_id, scraped_at FROM account_posts WHERE account = ?", (account,)))
+
+    def drop_account(self, account: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM account_posts WHERE account = ?", (account,))
+
+    def upsert(self, account: str, snapshots: dict):
+        """Store {post id: scraped_at}; an existing entry is only replaced by a newer snapshot."""
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO account_posts VALUES (?, ?, ?)
+                ON CONFLICT (account, post_id) DO UPDATE SET scraped_at = excluded.scraped_at
+                WHERE excluded.scraped_at > account_posts.scraped_at
+                """,
+                [(post_id, account, float(ts)) for post_id, ts in snapshots.items()],
+            )
+
+
+def record_scraped_at(record: dict, export_time: float) -> float:
+    """Scrape time of one record in epoch seconds."""
+    seconds = epoch_seconds(get_path(record, COLLECTED_FIELD))
+    return export_time if seconds is None else seconds
+
+
+class SnapshotFilter:
+    """
+    Per-record predicate for one export of one account. known is the
+    account's {post id: scraped_at}; records whose post id is unknown or
+    stored with an older snapshot are kept. The scrape time of every kept
+    record is appended to .scraped_at, in row order of the resulting frame.
+    """
+
+    def __init__(self, id_field: str, known: dict, export_time: float):
+        self.id_field = id_field
+        self.known = known
+        self.export_time = export_time or 0.0
+        self.scraped_at = []
+        self.skipped = 0
+
+    def __call__(self, record: dict) -> bool:
+        ts = record_scraped_at(record, self.export_time)
+        stored = self.known.get(str(get_path(record, self.id_field)))
+        if stored is not None and stored >= ts:
+            self.skipped += 1
+            return False
+        self.scraped_at.append(ts)
+        return True
+
+
+class SnapshotRecorder:
+    """
+    Per-record predicate that keeps every record and collects its engagement
+    snapshot (post id, scrape time, {counter: value}) for the snapshot store.
+    Must come before SnapshotFilter, which drops stale records.
+    """
+
+    def __init__(self, id_field: str, counters: dict, export_time: float):
+        self.id_field = id_field
+        self.counters = counters  # counter name -> dotted field
+        self.export_time = export_time or 0.0
+        self.rows = []
+
+    def __call__(self, record: dict) -> bool:
+        post_id = get_path(record, self.id_field)
+        if post_id is not _MISSING:
+            values = {}
+            for name, field in self.counters.items():
+                value = get_path(record, field)
+                values[name] = value if isinstance(value, int) and not isinstance(value, bool) else None
+            self.rows.append((post_id, record_scraped_at(record, self.export_time), values))
+        return True
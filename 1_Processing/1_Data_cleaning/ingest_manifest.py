@@ -0,0 +1,148 @@
+import io
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+# Per-account ingestion manifests for incremental cleaning.
+# One small JSON file per account (<clean_dir>/_manifest/<account>.json)
+# records which raw exports were already ingested (name + size + mtime),
+# the data.id set of the posts in the clean CSV and the newest post
+# timestamp seen (high-water mark, reported by the driver). The cleaning
+# driver only parses exports it has not seen; posts with a new id are
+# appended, newer snapshots of stored posts replace their rows (see
+# dedup_index.py). The ids added and updated by the last run are kept under
+# "last_run" (changed_ids()), so the topic labeling only relabels those rows
+# (label_posts.py --changed-only).
+
+MANIFEST_DIR_NAME = "_manifest"
+MANIFEST_VERSION = 1
+
+
+def manifest_path(clean_dir: Path, account: str) -> Path:
+    return Path(clean_dir) / MANIFEST_DIR_NAME / f"{account.rstrip('_')}.json"
+
+
+def new_manifest(account: str) -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "account": account,
+        "sources": {},
+        "ids": [],
+        "max_timestamp": None,
+        "last_run": {"at": None, "sources": [], "added_ids": [], "updated_ids": []},
+    }
+
+
+def load_manifest(path: Path):
+    """Manifest dict, or None if there is none (or it is from another version)."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def save_manifest(path: Path, manifest: dict):
+    """Write atomically, so an interrupted run never leaves half a manifest."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def source_signature(path: Path) -> dict:
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def max_timestamp(values, current=None):
+    """Newest timestamp (ISO string, UTC) of values and the current high-water mark."""
+    stamps = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="mixed")
+    if current is not None:
+        stamps = pd.concat([stamps, pd.Series([pd.Timestamp(current)])], ignore_index=True)
+    newest = stamps.max()
+    return None if pd.isna(newest) else newest.isoformat()
+
+
+def manifest_from_clean_csv(account: str, clean_path: Path, id_field: str, timestamp_field: str) -> dict:
+    """
+    Manifest for a clean CSV written before manifests existed: its ids and
+    newest timestamp count as ingested, its raw sources are unknown.
+    """
+    manifest = new_manifest(account)
+    clean_path = Path(clean_path)
+    if not clean_path.exists():
+        return manifest
+    df = pd.read_csv(clean_path, usecols=lambda c: c in (id_field, timestamp_field), dtype={id_field: str})
+    if id_field in df.columns:
+        manifest["ids"] = sorted(df[id_field].dropna().unique().tolist())
+    if timestamp_field in df.columns:
+        manifest["max_timestamp"] = max_timestamp(df[timestamp_field])
+    return manifest
+
+
+def append_rows(clean_path: Path, delta: pd.DataFrame):
+    """
+    Append delta rows to a clean CSV. Columns added by later stages
+    (sentiment, labels, engagement) stay in place and are left empty for
+    the new rows; only if the delta brings a column the file does not have
+    yet is the file rewritten.
+    """
+    clean_path = Path(clean_path)
+    if not clean_path.exists():
+        delta.to_csv(clean_path, index=False)
+        return
+    header = pd.read_csv(clean_path, nrows=0).columns.tolist()
+    if set(delta.columns) <= set(header):
+        delta.reindex(columns=header).to_csv(clean_path, mode="a", header=False, index=False)
+    else:
+        existing = pd.read_csv(clean_path, dtype={"data.id": str})
+        pd.concat([existing, delta], ignore_index=True).to_csv(clean_path, index=False)
+
+
+def replace_rows(clean_path: Path, rows: pd.DataFrame, id_field: str):
+    """
+    Overwrite the rows of a clean CSV whose id is in rows (newer snapshots).
+    Only the columns rows has are replaced; the file is handled as text, so
+    all other cells keep their exact CSV representation.
+    """
+    as_text = dict(dtype=str, keep_default_na=False)
+    existing = pd.read_csv(clean_path, **as_text)
+    new = pd.read_csv(io.StringIO(rows.to_csv(index=False)), **as_text).drop_duplicates(id_field, keep="last")
+    new = new.set_index(id_field)
+
+    position = pd.Series(range(len(existing)), index=existing[id_field])
+    position = position[~position.index.duplicated()]
+    hit = new.index[new.index.isin(position.index)]
+    for col in [c for c in new.columns if c in existing.columns]:
+        existing.loc[position[hit].to_numpy(), col] = new.loc[hit, col].to_numpy()
+    existing.to_csv(clean_path, index=False)
+
+
+def record_run(manifest: dict, sources, added_ids, timestamps, updated_ids=()):
+    manifest["ids"] = sorted(set(manifest["ids"]).union(added_ids))
+    manifest["max_timestamp"] = max_timestamp(timestamps, manifest["max_timestamp"])
+    manifest["last_run"] = {
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "sources": list(sources),
+        "added_ids": list(added_ids),
+        "updated_ids": list(updated_ids),
+    }
+
+
+def changed_ids(clean_dir: Path) -> dict:
+    """{account: [data.id added or updated by the last cleaning run]} for a clean folder."""
+    changed = {}
+    for path in sorted((Path(clean_dir) / MANIFEST_DIR_NAME).glob("*.json")):
+        manifest = load_manifest(path)
+        if manifest is not None:
+            last_run = manifest["last_run"]
+            changed[manifest["account"]] = last_run["added_ids"] + last_run.get("updated_ids", [])
+    return changed
@@ -0,0 +1,108 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from timestamps import UNIT_DIVISORS, epoch_unit
+
+
+# Streaming reader for Zeeschuimer NDJSON exports.
+# Parses one line at a time and keeps only the projected dotted fields
+# (e.g. "data.caption.text"), so memory grows with the selected columns of
+# the kept records instead of with the full nested export. The resulting
+# frame matches json_normalize(...)[columns]: missing keys become NaN,
+# explicit nulls stay None, and only fields present in at least one record
+# become columns.
+
+_MISSING = object()
+
+
+def get_path(record: dict, path: str):
+    """Value at a dotted path like 'data.stats.diggCount', or _MISSING."""
+    value = record
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def epoch_seconds(value):
+    """
+    Numeric epoch -> seconds (float), detecting s/ms/us/ns by magnitude like
+    timestamps.decode_timestamps does. Anything that is not a number (ISO
+    strings, None, ...) returns None.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return value / UNIT_DIVISORS[epoch_unit(value)]
+
+
+def epoch_window_filter(field: str, start: pd.Timestamp, end: pd.Timestamp, keep_non_numeric: bool = False):
+    """
+    Per-record predicate: numeric epoch at `field` within [start, end].
+    With keep_non_numeric, records whose timestamp is not numeric are kept
+    so the cleaner's full (ISO string) decoding can decide on them later.
+    """
+    lo = start.timestamp()
+    hi = end.timestamp()
+
+    def keep(record: dict) -> bool:
+        seconds = epoch_seconds(get_path(record, field))
+        if seconds is None:
+            return keep_non_numeric
+        return lo <= seconds <= hi
+
+    return keep
+
+
+def all_of(*predicates):
+    """
+    Per-record predicate that is true if every given predicate is (None
+    entries are ignored). Evaluated left to right and short-circuiting, so
+    a predicate that records what it keeps should come last.
+    """
+    predicates = [p for p in predicates if p is not None]
+
+    def keep(record: dict) -> bool:
+        return all(p(record) for p in predicates)
+
+    return keep
+
+
+def read_ndjson_columns(file_name, columns, keep=None, require_all: bool = False) -> pd.DataFrame:
+    """
+    Stream an NDJSON file and build a DataFrame of the projected columns.
+
+    keep: optional predicate on the parsed record; records it rejects are
+          dropped before any column value is stored.
+    require_all: raise KeyError if a column never appears (like .loc[:, cols]);
+          otherwise columns that never appear are left out.
+    """
+    values = {col: [] for col in columns}
+    present = set()
+
+    with open(file_name, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+
+            row = [get_path(record, col) for col in columns]
+            present.update(col for col, v in zip(columns, row) if v is not _MISSING)
+
+            if keep is not None and not keep(record):
+                continue
+            for col, v in zip(columns, row):
+                values[col].append(np.nan if v is _MISSING else v)
+
+    missing = [col for col in columns if col not in present]
+    if require_all and missing:
+        raise KeyError(f"{missing} not found in {file_name}")
+
+    return pd.DataFrame({col: values[col] for col in columns if col in present})
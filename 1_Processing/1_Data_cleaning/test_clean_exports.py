@@ -0,0 +1,71 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+
+# A post published by two party accounts (a collab) stays in both clean
+# files, whatever the number of workers. Runs clean_exports.py on synthetic
+# TikTok exports in a copy of 1_Processing, so the real data is not touched.
+#
+#   python -m pytest 1_Processing/1_Data_cleaning/test_clean_exports.py
+
+PROCESSING_DIR = Path(__file__).resolve().parent.parent
+EXPORT = "{account}_Tiktok_zeeschuimer-export-tiktok.com-2025-10-13T09{minute}00.ndjson"
+SHARED_ID = "7500000000000000001"
+
+
+def tiktok_record(post_id: str, author: str, create_time: int = 1756000000) -> dict:
+    return {
+        "timestamp_collected": 1760347639523,
+        "source_platform": "tiktok.com",
+        "source_platform_url": f"https://www.tiktok.com/@{author}",
+        "data": {
+            "id": post_id,
+            "desc": "Abstimmung am 28. September",
+            "createTime": create_time,
+            "stats": {"collectCount": 1, "commentCount": 2, "diggCount": 3, "playCount": 40, "shareCount": 0},
+            "author": {"nickname": author, "id": author, "uniqueId": author},
+            "duetDisplay": 0,
+            "duetEnabled": True,
+        },
+    }
+
+
+def write_export(path: Path, records: list):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    shutil.copytree(PROCESSING_DIR, tmp_path / "1_Processing", ignore=shutil.ignore_patterns("__pycache__"))
+    raw_dir = tmp_path / "A_Data" / "1_Tiktok" / "1_RAW"
+    raw_dir.mkdir(parents=True)
+    write_export(raw_dir / EXPORT.format(account="1_A", minute="10"), [
+        tiktok_record(SHARED_ID, "a"),
+        tiktok_record("7500000000000000002", "a"),
+    ])
+    write_export(raw_dir / EXPORT.format(account="2_B", minute="20"), [
+        tiktok_record(SHARED_ID, "a"),
+        tiktok_record("7500000000000000003", "b"),
+    ])
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_collab_post_kept_for_every_account(tree, workers):
+    subprocess.run(
+        [sys.executable, "clean_exports.py", "--platform", "tiktok", "--full", "--workers", str(workers)],
+        cwd=tree / "1_Processing" / "1_Data_cleaning", check=True, capture_output=True,
+    )
+    clean_dir = tree / "A_Data" / "1_Tiktok" / "2_CLEAN"
+    ids = {
+        account: set(pd.read_csv(clean_dir / f"{account}__cleaned.csv", dtype={"data.id": str})["data.id"])
+        for account in ("1_A", "2_B")
+    }
+    assert ids["1_A"] == {SHARED_ID, "7500000000000000002"}
+    assert ids["2_B"] == {SHARED_ID, "7500000000000000003"}
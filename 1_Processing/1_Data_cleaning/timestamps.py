@@ -0,0 +1,74 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+
+# Shared timestamp decoder for the cleaners.
+# Exports mix epoch numbers of different precision (Instagram: seconds or
+# milliseconds, sometimes micro-/nanoseconds), numeric strings and ISO
+# strings. Every value is classified once, by magnitude, with a single
+# np.searchsorted over the unit bounds; each class is then converted with
+# one bulk to_datetime call. The result is always tz-aware UTC.
+
+# upper bound (exclusive) of each epoch unit; anything >= 1e17 is ns
+UNIT_BOUNDS = np.array([1e11, 1e14, 1e17])
+EPOCH_UNITS = ["s", "ms", "us", "ns"]
+UNIT_DIVISORS = {"s": 1.0, "ms": 1e3, "us": 1e6, "ns": 1e9}
+_BOUNDS = tuple(UNIT_BOUNDS.tolist())
+
+
+def epoch_unit(value: float) -> str:
+    """Epoch unit of one number by magnitude (same rule as decode_timestamps)."""
+    return EPOCH_UNITS[bisect.bisect_right(_BOUNDS, value)]
+
+
+def decode_timestamps(values) -> tuple:
+    """
+    Decode a column of mixed timestamps to datetime64[ns, UTC].
+
+    Returns (series, counts) where counts has the number of values decoded
+    per class: 's', 'ms', 'us', 'ns' (numeric epochs, also as strings),
+    'iso' (ISO 8601 strings), 'other' (strings only the flexible parser
+    understood), 'invalid' (not decodable) and 'missing' (None/NaN/'').
+    """
+    raw = values if isinstance(values, pd.Series) else pd.Series(values)
+    n = len(raw)
+    out = np.full(n, np.datetime64("NaT", "ns"))
+    counts = {}
+
+    # --- one classification pass
+    numeric = pd.to_numeric(raw, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    is_numeric = ~np.isnan(numeric)
+    unit_class = np.searchsorted(UNIT_BOUNDS, np.where(is_numeric, numeric, 0.0), side="right")
+
+    # --- numeric epochs, one bulk conversion per unit
+    for i, unit in enumerate(EPOCH_UNITS):
+        mask = is_numeric & (unit_class == i)
+        if mask.any():
+            converted = pd.to_datetime(numeric[mask], unit=unit, errors="coerce")
+            out[mask] = np.asarray(converted, dtype="datetime64[ns]")
+            counts[unit] = int(mask.sum())
+
+    # --- strings: ISO 8601 first, then the flexible parser for the rest
+    text = raw.astype("string").str.strip().to_numpy(dtype=object, na_value=None)
+    is_text = ~is_numeric & np.array([t is not None and t != "" for t in text], dtype=bool)
+    if is_text.any():
+        strings = pd.Series(text[is_text])
+        iso = pd.to_datetime(strings, errors="coerce", utc=True, format="ISO8601")
+        parsed = iso.to_numpy(dtype="datetime64[ns]", na_value=np.datetime64("NaT", "ns"))
+        counts["iso"] = int(iso.notna().sum())
+
+        rest = iso.isna().to_numpy()
+        if rest.any():
+            flexible = pd.to_datetime(strings[rest], errors="coerce", utc=True, format="mixed")
+            parsed[rest] = flexible.to_numpy(dtype="datetime64[ns]", na_value=np.datetime64("NaT", "ns"))
+            counts["other"] = int(flexible.notna().sum())
+            counts["invalid"] = int(flexible.isna().sum())
+        out[is_text] = parsed
+
+    counts["missing"] = int(n - is_numeric.sum() - is_text.sum())
+    counts = {k: v for k, v in counts.items() if v}
+
+    series = pd.Series(out, index=raw.index).dt.tz_localize("UTC")
+    return series, counts
@@ -1,31 +1,160 @@
 from pathlib import Path
+import argparse
+import csv
+import os
+import time
+
 import pandas as pd
-from germansentiment import SentimentModel
 
-# 1) project root = folder where this script sits (adjust if needed)
-# if this file is in e.g. scripts/sentiment.py and your data is in A_Data/..., go up one level
-PROJECT_ROOT = Path(__file__).resolve().parent.parent  # adjust .parent/.parent as needed
+# never reach out to the Hugging Face hub: the model must already be on disk
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+from germansentiment import SentimentModel  # noqa: E402  (after the offline switches)
+
+from sentiment_cache import PREDICTION_CACHE_FILE, PredictionCache, caption_hash, model_revision
+
+
+# Transformer sentiment (germansentiment / german-sentiment-bert) for every
+# party CSV on both platforms, CPU-friendly:
+#   - captions are sorted by token length and cut into fixed-size batches,
+#     so each batch pads to a similar length and peak memory stays bounded
+#   - predictions are appended to disk after every batch
+#   - per-batch latency and throughput are logged next to the predictions
+#   - labels and class probabilities are cached per (caption hash, model
+#     revision), so only captions the model has not seen yet are run
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+PLATFORMS = {
+    "tiktok": {
+        "input": PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN",
+        "output": PROJECT_ROOT / "A_Data" / "1_Tiktok" / "3_SENTIMENT_BERT",
+        "text_column": "data.desc",
+    },
+    "instagram": {
+        "input": PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN",
+        "output": PROJECT_ROOT / "A_Data" / "2_Instagram" / "3_SENTIMENT_BERT",
+        "text_column": "data.caption.text",
+    },
+}
+
+# local copy of oliverguhr/german-sentiment-bert (config, tokenizer, weights)
+DEFAULT_MODEL_DIR = Path(
+    os.environ.get("GERMANSENTIMENT_MODEL_DIR", PROJECT_ROOT / "models" / "german-sentiment-bert")
+)
+DEFAULT_BATCH_SIZE = 16
+
+LABELS = ["positive", "negative", "neutral"]
+PREDICTION_FIELDS = ["row", "data.id", "sentiment", *[f"prob_{label}" for label in LABELS]]
+BATCH_LOG_FIELDS = ["batch", "n_captions", "max_tokens", "seconds", "captions_per_s", "tokens_per_s"]
+
+
+def length_sorted_batches(lengths, batch_size: int):
+    """Row indices grouped into batches of similar token length (shortest first)."""
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def token_lengths(model: SentimentModel, texts) -> list:
+    cleaned = [model.clean_text(t) for t in texts]
+    encoded = model.tokenizer(cleaned, add_special_tokens=True, truncation=True)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def prediction_row(row, post_id, label, probabilities: dict) -> list:
+    return [row, post_id, label, *[probabilities.get(name) for name in LABELS]]
+
+
+def predict_file(model: SentimentModel, cache: PredictionCache, csv_path: Path, text_column: str,
+                 output_dir: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Predict one party CSV. Writes <stem>.csv (row, data.id, sentiment,
+    class probabilities) and <stem>_batches.csv (per-batch timings of the
+    cache misses) into output_dir.
+    """
+    df = pd.read_csv(csv_path, usecols=lambda c: c in (text_column, "data.id"), dtype={"data.id": "string"})
+    if text_column not in df.columns:
+        print(f"  Column {text_column} not found in {csv_path.name}, skipping.")
+        return
+
+    texts = df[text_column].fillna("").astype(str).tolist()
+    ids = df["data.id"].tolist() if "data.id" in df.columns else [None] * len(texts)
+    hashes = [caption_hash(t) for t in texts]
+    cached = cache.get_many(hashes)
+    todo = [r for r, h in enumerate(hashes) if h not in cached]
+    print(f"  Prediction cache: {len(texts) - len(todo)} hits, {len(todo)} captions to run")
+
+    todo_lengths = token_lengths(model, [texts[r] for r in todo]) if todo else []
+    lengths = dict(zip(todo, todo_lengths))
+
+    pred_path = output_dir / f"{csv_path.stem}.csv"
+    log_path = output_dir / f"{csv_path.stem}_batches.csv"
+    total_start = time.perf_counter()
+
+    with open(pred_path, "w", newline="", encoding="utf-8") as pred_f, \
+            open(log_path, "w", newline="", encoding="utf-8") as log_f:
+        pred_out = csv.writer(pred_f)
+        log_out = csv.writer(log_f)
+        pred_out.writerow(PREDICTION_FIELDS)
+        log_out.writerow(BATCH_LOG_FIELDS)
+
+        pred_out.writerows(
+            prediction_row(r, ids[r], *cached[h]) for r, h in enumerate(hashes) if h in cached
+        )
+
+        for b, batch in enumerate(length_sorted_batches(todo_lengths, batch_size)):
+            rows = [todo[i] for i in batch]
+            start = time.perf_counter()
+            labels, probabilities = model.predict_sentiment([texts[r] for r in rows], output_probabilities=True)
+            seconds = max(time.perf_counter() - start, 1e-9)
+
+            fresh = {hashes[r]: (label, dict(probs)) for r, label, probs in zip(rows, labels, probabilities)}
+            cache.put_many(fresh)
+            pred_out.writerows(prediction_row(r, ids[r], *fresh[hashes[r]]) for r in rows)
+            pred_f.flush()
+
+            n_tokens = sum(lengths[r] for r in rows)
+            log_out.writerow([
+                b, len(rows), max(lengths[r] for r in rows), round(seconds, 4),
+                round(len(rows) / seconds, 2), round(n_tokens / seconds, 1),
+            ])
 
-# 2) define input/output relative to project root
-input_csv = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN" / "1_SVP__cleaned.csv"
-output_csv = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN" / "1_SVP__cleaned_with_sentiment.csv"
+    elapsed = time.perf_counter() - total_start
+    rate = len(texts) / elapsed if elapsed > 0 else float("nan")
+    print(f"  {len(texts)} captions in {elapsed:.1f}s ({rate:.1f} captions/s) -> {pred_path}")
 
-# 3) load model
-model = SentimentModel()
 
-# 4) read data
-df = pd.read_csv(input_csv)
+def main(platforms, model_dir: Path = DEFAULT_MODEL_DIR, batch_size: int = DEFAULT_BATCH_SIZE,
+         revision: str = None, cache_path: Path = PREDICTION_CACHE_FILE):
+    if not Path(model_dir).is_dir():
+        raise FileNotFoundError(
+            f"No local model at {model_dir}. Download oliverguhr/german-sentiment-bert once "
+            f"and point --model-dir (or GERMANSENTIMENT_MODEL_DIR) to it."
+        )
+    model = SentimentModel(str(model_dir))
+    revision = revision or model_revision(model_dir)
+    print(f"Model {model_dir} (revision {revision})")
 
-# 5) pick the column to analyze
-col = "data.caption.text"
-texts = df[col].fillna("").tolist()
+    with PredictionCache(cache_path, model_revision=revision) as cache:
+        for platform in platforms:
+            config = PLATFORMS[platform]
+            config["output"].mkdir(parents=True, exist_ok=True)
+            for csv_path in sorted(config["input"].glob("*__cleaned.csv")):
+                print(f"Processing {csv_path} ...")
+                predict_file(model, cache, csv_path, config["text_column"], config["output"], batch_size)
 
-# 6) run sentiment
-sentiments = model.predict_sentiment(texts)
 
-# 7) attach to dataframe
-df["sentiment"] = sentiments
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched offline germansentiment inference.")
+    parser.add_argument("--platform", choices=[*PLATFORMS, "all"], default="all")
+    parser.add_argument("--model-dir", type=Path, default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--model-revision", default=None,
+        help="cache key for the model (default: snapshot commit or hash of the model directory)",
+    )
+    args = parser.parse_args()
 
-# 8) save
-df.to_csv(output_csv, index=False)
-print(f"Saved to {output_csv}")
+    platforms = list(PLATFORMS) if args.platform == "all" else [args.platform]
+    main(platforms, model_dir=args.model_dir, batch_size=args.batch_size, revision=args.model_revision)
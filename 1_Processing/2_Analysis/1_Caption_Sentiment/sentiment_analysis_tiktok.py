@@ -1,9 +1,11 @@
-import string
-from nltk.tokenize.treebank import TreebankWordTokenizer
 from pathlib import Path
+import argparse
 import os
+import sys
 import pandas as pd
-import math
+
+from sentiment_lexicon import load_lexicon, analyze_parallel, POSITIVE_FILE, NEGATIVE_FILE
+from sentiment_cache import analyze_cached
 
 
 # Sentiment analysis script for German, rule-based.
@@ -15,150 +17,90 @@ input_csv = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN"
 datafolder = PROJECT_ROOT / "1_Processing" / "2_Analysis" / "1_Caption_Sentiment" / "data"
 #output_csv.mkdir(parents=True, exist_ok=True)
 
-TEXT_COLUMN = "data.desc"
-
-# ------------- helpers ------------- #
-
-# very simple sentence splitter (no pickle, no download)
-def simple_sentence_tokenize(text: str):
-    parts = []
-    current = []
-    for ch in text:
-        current.append(ch)
-        if ch in ".!?":
-            parts.append("".join(current).strip())
-            current = []
-    if current:
-        parts.append("".join(current).strip())
-    return [p for p in parts if p]
-
-
-word_tokenizer = TreebankWordTokenizer()
-
-def treebank_tokenizer(sentence: str):
-    # handle None / NaN / non-string safely
-    if sentence is None:
-        return []
-    if isinstance(sentence, float) and math.isnan(sentence):
-        return []
-    if not isinstance(sentence, str):
-        sentence = str(sentence)
-
-    tokens = []
-    for s in simple_sentence_tokenize(sentence):
-        tokens.extend(word_tokenizer.tokenize(s))
-    # strip punctuation + lowercase
-    tokens = [
-        "".join(ch for ch in tok if ch not in string.punctuation).lower()
-        for tok in tokens
-    ]
-    return [t for t in tokens if t]
-
-
-
-def stopword_filter(tokens):
-    file_to_open = datafolder / "stopWords.txt"
-    with open(file_to_open, "r", encoding="utf-8") as f:
-        stopwords = [line.strip().lower() for line in f if line.strip()]
-    # keep only tokens that are NOT stopwords
-    return [t for t in tokens if t not in stopwords]
-
-
-def negation_words():
-    negdict = datafolder / "negationswoerter.txt"
-    with open(negdict, "r", encoding="utf-8") as negwords:
-        return [line.strip().lower() for line in negwords if line.strip()]
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import party_of, update_columns  # noqa: E402
 
+TEXT_COLUMN = "data.desc"
 
 # ------------- core logic ------------- #
 
 def analyze(query: str, dict_filename: str) -> float:
-    tokens = treebank_tokenizer(query)
-    tokens = stopword_filter(tokens)
-    negs = set(negation_words())
-    dict_path = datafolder / dict_filename
-
-    sentiment_value = 0.0
-
-    with open(dict_path, "r", encoding="utf-8") as sentis:
-        for s in sentis:
-            # SentiWS format: lemma|lemma2<TAB>score<TAB>inflections
-            cells = s.split("\t")
-            lemma_parts = cells[0].lower().split("|")
-            value = float(cells[1].strip())
-            if len(cells) > 2:
-                infl = [w.strip().lower() for w in cells[2].split(",") if w.strip()]
-            else:
-                infl = []
-
-            # set for faster lookup
-            all_forms = set(lemma_parts) | set(infl)
-
-            # go through tokens in the sentence
-            for idx, tok in enumerate(tokens):
-                if tok in all_forms:
-                    # check prev/next for negation but carefully
-                    neg_factor = 1.0
-                    if idx > 0 and tokens[idx - 1] in negs:
-                        neg_factor = -0.5
-                    elif idx < len(tokens) - 1 and tokens[idx + 1] in negs:
-                        neg_factor = -0.5
-                    sentiment_value += value * neg_factor
-
-    return sentiment_value
+    lexicon = load_lexicon(datafolder)
+    return lexicon.polarity(lexicon.tokenize(query), dict_filename)
 
 
 def positive_sentiment(query: str) -> float:
-    return analyze(query, "SentiWS_v2.0_Positive.txt")
+    return analyze(query, POSITIVE_FILE)
 
 
 def negative_sentiment(query: str) -> float:
-    return analyze(query, "SentiWS_v2.0_Negative.txt")
+    return analyze(query, NEGATIVE_FILE)
 
 
 def main(query: str):
-    # SentiWS positive are >0, negative are <0, so we can just sum
-    value = round(positive_sentiment(query) + negative_sentiment(query), 2)
-    # clamp to [-1, 1]
-    value = max(min(value, 1.0), -1.0)
-    return {"sentiment": value}
+    # SentiWS positive are >0, negative are <0, so we can just sum;
+    # the lexicon rounds to 2 decimals and clamps to [-1, 1]
+    return {"sentiment": load_lexicon(datafolder).score(query)}
 
 
-if __name__ == "__main__":
+def process_folder(folder: Path, workers: int = 1, use_cache: bool = True):
+    """
+    Score every CSV in the folder and overwrite it with a sentiment_rulebased
+    column plus one emotion_<name> word count column per emotion list
+    (Ekel, Freude, ...). Captions of all files are scored in one (optionally parallel)
+    run, so large files are split across workers as well. With use_cache,
+    captions already scored with the current lexicon come from the cache.
+    """
+    frames = {}
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(".csv"):
+            continue
 
-    if __name__ == "__main__":
+        filepath = folder / filename
+        print(f"Processing {filepath} ...")
 
-        for filename in os.listdir(input_csv):
-            if not filename.endswith(".csv"):
-                continue
+        df = pd.read_csv(filepath)
 
-            filepath = input_csv / filename
-            print(f"Processing {filepath} ...")
+        if TEXT_COLUMN not in df.columns:
+            print(f"  Column {TEXT_COLUMN} not found in {filename}, skipping.")
+            continue
 
-            df = pd.read_csv(filepath)
+        frames[filepath] = df
 
-            if TEXT_COLUMN not in df.columns:
-                print(f"  Column {TEXT_COLUMN} not found in {filename}, skipping.")
-                continue
+    texts = [text for df in frames.values() for text in df[TEXT_COLUMN].tolist()]
+    if use_cache:
+        scores = analyze_cached(texts, workers=workers, folder=datafolder)
+    else:
+        scores = analyze_parallel(texts, workers=workers, folder=datafolder)
 
-            # apply sentiment to each caption and store as new column
-            df["sentiment_rulebased"] = df[TEXT_COLUMN].apply(
-                lambda x: main(x)["sentiment"]
-            )
+    start = 0
+    for filepath, df in frames.items():
+        for col, values in scores.items():
+            df[col] = values[start:start + len(df)]
+        start += len(df)
 
-            # overwrite the original file
-            df.to_csv(filepath, index=False)
-            print(f"  Saved with sentiment to {filepath}")
+        # overwrite the original file
+        df.to_csv(filepath, index=False)
+        update_columns(df, "tiktok", party_of(filepath), list(scores))
+        print(f"  Saved with sentiment to {filepath}")
 
-        print("Use test or call main(<query>)")
 
-        testQuery = "Die E-ID ist die beste Idee, die der Schweizer Bundesstaat ja hatte. Wir setzen uns für dieses gute Projekt ein."
-        print(testQuery)
-        print(main(testQuery))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rule-based sentiment for the TikTok captions.")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="number of worker processes (0 = all cores, default 1 = serial)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="re-score every caption instead of reusing cached scores",
+    )
+    args = parser.parse_args()
+
+    process_folder(input_csv, workers=args.workers, use_cache=not args.no_cache)
 
-        testQuery2 = "Die E-ID bevormundet die Schweizer Stimmbevölkerung. Die Lösung ist nicht geeignet und gar nicht durchdacht."
-        print(testQuery2)
-        print(main(testQuery2))
+    print("Use test or call main(<query>)")
 
     testQuery = "Die E-ID ist die beste Idee, die der Schweizer Bundesstaat ja hatte. Wir setzen uns für dieses gute Projekt ein."
     print(testQuery)
@@ -166,4 +108,4 @@ if __name__ == "__main__":
 
     testQuery2 = "Die E-ID bevormundet die Schweizer Stimmbevölkerung. Die Lösung ist nicht geeignet und gar nicht durchdacht."
     print(testQuery2)
-    print(main(testQuery2))
\ No newline at end of file
+    print(main(testQuery2))
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from sentiment_lexicon import (
+    DATA_FOLDER, EMOTION_COLUMNS, NEGATION_RULE_VERSION, SENTIMENT_COLUMN, analyze_parallel, load_lexicon,
+)
+
+
+# Persistent memo of rule-based caption scores (polarity + emotion counts).
+# Key: (hash of the normalized caption, lexicon source hash, negation rule
+# version), so editing the lexicon or the scorer invalidates old entries
+# automatically. Stored in a small SQLite file; once it holds more than
+# max_entries rows the least recently used ones are evicted.
+# PredictionCache does the same for germansentiment predictions, keyed by
+# (caption hash, model revision).
+
+CACHE_FILE = DATA_FOLDER / "sentiment_cache.sqlite"
+PREDICTION_CACHE_FILE = DATA_FOLDER / "prediction_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 500_000
+
+# SQLite's default limit on bound parameters per statement is 999
+_SQL_CHUNK = 900
+
+
+def normalize_caption(text) -> str:
+    """None/NaN -> '', otherwise the caption with whitespace runs collapsed."""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    return " ".join(str(text).split())
+
+
+def caption_hash(text) -> str:
+    return hashlib.sha1(normalize_caption(text).encode("utf-8")).hexdigest()
+
+
+def _evict_lru(conn: sqlite3.Connection, table: str, max_entries: int):
+    (count,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+    if count > max_entries:
+        conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN "
+            f"(SELECT rowid FROM {table} ORDER BY last_used LIMIT ?)",
+            (count - max_entries,),
+        )
+
+
+class SentimentCache:
+    """
+    On-disk key-value store: caption hash -> (sentiment_rulebased, emotion
+    counts). Emotion counts are kept as one comma-separated string in
+    EMOTION_COLUMNS order; that order is covered by the lexicon version.
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, lexicon_version: str = None,
+                 rule_version: int = NEGATION_RULE_VERSION, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.lexicon_version = lexicon_version or load_lexicon().source_hash
+        self.rule_version = rule_version
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS caption_scores (
+                caption_hash    TEXT NOT NULL,
+                lexicon_version TEXT NOT NULL,
+                rule_version    INTEGER NOT NULL,
+                sentiment       REAL NOT NULL,
+                emotions        TEXT NOT NULL,
+                last_used       REAL NOT NULL,
+                PRIMARY KEY (caption_hash, lexicon_version, rule_version)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS caption_scores_last_used ON caption_scores (last_used)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, hashes) -> dict:
+        """{hash: (sentiment, [emotion counts])} for every cached hash; touches the hits."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        for i in range(0, len(hashes), _SQL_CHUNK):
+            chunk = hashes[i:i + _SQL_CHUNK]
+            rows = self.conn.execute(
+                f"""
+                SELECT caption_hash, sentiment, emotions FROM caption_scores
+                WHERE lexicon_version = ? AND rule_version = ?
+                  AND caption_hash IN ({",".join("?" * len(chunk))})
+                """,
+                (self.lexicon_version, self.rule_version, *chunk),
+            )
+            for h, sentiment, emotions in rows:
+                found[h] = (sentiment, [int(c) for c in emotions.split(",")])
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE caption_scores SET last_used = ? "
+                    "WHERE caption_hash = ? AND lexicon_version = ? AND rule_version = ?",
+                    [(now, h, self.lexicon_version, self.rule_version) for h in found],
+                )
+        return found
+
+    def put_many(self, items: dict):
+        """Store {hash: (sentiment, [emotion counts])}; evict the oldest rows above max_entries."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO caption_scores VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (h, self.lexicon_version, self.rule_version, float(sentiment),
+                     ",".join(str(int(c)) for c in emotions), now)
+                    for h, (sentiment, emotions) in items.items()
+                ],
+            )
+            _evict_lru(self.conn, "caption_scores", self.max_entries)
+
+
+def model_revision(model_dir: Path) -> str:
+    """
+    Revision id of a local transformer model. A Hugging Face cache snapshot
+    (.../snapshots/<commit>) is identified by its commit hash; any other
+    directory by a hash of its config plus the names and sizes of its files.
+    """
+    model_dir = Path(model_dir).resolve()
+    if model_dir.parent.name == "snapshots":
+        return model_dir.name
+    h = hashlib.sha256()
+    config = model_dir / "config.json"
+    if config.exists():
+        h.update(config.read_bytes())
+    for f in sorted(model_dir.iterdir()):
+        if f.is_file():
+            h.update(f"{f.name}:{f.stat().st_size}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class PredictionCache:
+    """
+    On-disk key-value store: (caption hash, model revision) -> predicted
+    label and class probabilities ({label: probability}, stored as JSON).
+    """
+
+    def __init__(self, path: Path = PREDICTION_CACHE_FILE, model_revision: str = "",
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.model_revision = model_revision
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS predictions (
+                caption_hash   TEXT NOT NULL,
+                model_revision TEXT NOT NULL,
+                label          TEXT NOT NULL,
+                probabilities  TEXT NOT NULL,
+                last_used      REAL NOT NULL,
+                PRIMARY KEY (caption_hash, model_revision)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, hashes) -> dict:
+        """{hash: (label, {label: probability})} for every cached hash; touches the hits."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        for i in range(0, len(hashes), _SQL_CHUNK):
+            chunk = hashes[i:i + _SQL_CHUNK]
+            rows = self.conn.execute(
+                f"""
+                SELECT caption_hash, label, probabilities FROM predictions
+                WHERE model_revision = ? AND caption_hash IN ({",".join("?" * len(chunk))})
+                """,
+                (self.model_revision, *chunk),
+            )
+            for h, label, probabilities in rows:
+                found[h] = (label, json.loads(probabilities))
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE predictions SET last_used = ? WHERE caption_hash = ? AND model_revision = ?",
+                    [(now, h, self.model_revision) for h in found],
+                )
+        return found
+
+    def put_many(self, items: dict):
+        """Store {hash: (label, {label: probability})}; evict the oldest rows above max_entries."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                [
+                    (h, self.model_revision, label, json.dumps(probabilities), now)
+                    for h, (label, probabilities) in items.items()
+                ],
+            )
+            _evict_lru(self.conn, "predictions", self.max_entries)
+
+
+def analyze_cached(texts, workers: int = 1, folder: Path = DATA_FOLDER, cache_path: Path = CACHE_FILE) -> dict:
+    """
+    Like analyze_parallel(), but only captions that are not in the cache
+    yet are scored; everything else is read back from disk.
+    """
+    texts = list(texts)
+    hashes = [caption_hash(t) for t in texts]
+    lexicon = load_lexicon(folder)
+
+    with SentimentCache(cache_path, lexicon_version=lexicon.source_hash) as cache:
+        known = cache.get_many(hashes)
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in known and h not in missing:
+                missing[h] = normalize_caption(t)
+        print(f"  Sentiment cache: {len(texts) - sum(h in missing for h in hashes)} hits, "
+              f"{len(missing)} captions to score")
+
+        if missing:
+            result = analyze_parallel(list(missing.values()), workers=workers, folder=folder)
+            emotions = np.column_stack([result[c] for c in EMOTION_COLUMNS]).tolist()
+            fresh = dict(zip(missing.keys(), zip(result[SENTIMENT_COLUMN].tolist(), emotions)))
+            cache.put_many(fresh)
+            known.update(fresh)
+
+    rows = [known[h] for h in hashes]
+    counts = np.array([emotions for _, emotions in rows], dtype=np.int64).reshape(len(rows), len(EMOTION_COLUMNS))
+    result = {SENTIMENT_COLUMN: np.array([sentiment for sentiment, _ in rows], dtype=np.float64)}
+    for i, col in enumerate(EMOTION_COLUMNS):
+        result[col] = counts[:, i]
+    return result
+
+
+def score_cached(texts, workers: int = 1, folder: Path = DATA_FOLDER, cache_path: Path = CACHE_FILE) -> np.ndarray:
+    """Polarity only (see analyze_cached)."""
+    return analyze_cached(texts, workers, folder, cache_path)[SENTIMENT_COLUMN]
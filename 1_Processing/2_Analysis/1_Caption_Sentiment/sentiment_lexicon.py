@@ -0,0 +1,476 @@
+import hashlib
+import json
+import math
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+from nltk.tokenize.treebank import TreebankWordTokenizer
+
+
+# In-memory SentiWS lexicon for the rule-based caption scorer.
+# Parses the lexicon, stopword and negation files once and keeps them as
+# lookup tables, so scoring a caption costs one dict lookup per token
+# instead of a full scan of the SentiWS files.
+# The compiled tables are also written to a versioned binary file next to
+# the sources; later processes memory-map that file instead of re-parsing.
+# The emotion word lists (Ekel, Freude, ...) are compiled into the same
+# form index as a bitmask, so one token pass yields polarity + emotions.
+
+DATA_FOLDER = Path(__file__).resolve().parent / "data"
+
+POSITIVE_FILE = "SentiWS_v2.0_Positive.txt"
+NEGATIVE_FILE = "SentiWS_v2.0_Negative.txt"
+STOPWORD_FILE = "stopWords.txt"
+NEGATION_FILE = "negationswoerter.txt"
+
+# emotion name -> word list; one emotion_<name> count column per entry
+EMOTION_FILES = {
+    "ekel": "Ekel.txt",
+    "freude": "Freude.txt",
+    "furcht": "Furcht.txt",
+    "trauer": "Trauer.txt",
+    "ueberraschung": "Ueberraschung.txt",
+    "verachtung": "Verachtung.txt",
+    "wut": "Wut.txt",
+}
+
+SOURCE_FILES = (POSITIVE_FILE, NEGATIVE_FILE, STOPWORD_FILE, NEGATION_FILE, *EMOTION_FILES.values())
+
+SENTIMENT_COLUMN = "sentiment_rulebased"
+EMOTION_COLUMNS = [f"emotion_{name}" for name in EMOTION_FILES]
+
+# compiled binary lexicon (derived from SOURCE_FILES, not checked in)
+CACHE_FILE = "sentiws_lexicon.bin"
+CACHE_MAGIC = b"SENTIWS\0"
+CACHE_FORMAT_VERSION = 2
+_CACHE_ALIGN = 64
+
+# a lexicon hit directly before/after a negation word counts -0.5x
+NEGATION_FACTOR = -0.5
+# bump whenever tokenization or the negation rule changes; part of the
+# key of cached caption scores (see sentiment_cache.py)
+NEGATION_RULE_VERSION = 1
+
+
+# ------------- tokenizer ------------- #
+
+# very simple sentence splitter (no pickle, no download)
+def simple_sentence_tokenize(text: str):
+    parts = []
+    current = []
+    for ch in text:
+        current.append(ch)
+        if ch in ".!?":
+            parts.append("".join(current).strip())
+            current = []
+    if current:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+word_tokenizer = TreebankWordTokenizer()
+_PUNCT_TABLE = str.maketrans("", "", string.punctuation)
+
+
+def treebank_tokenizer(sentence: str):
+    # handle None / NaN / non-string safely
+    if sentence is None:
+        return []
+    if isinstance(sentence, float) and math.isnan(sentence):
+        return []
+    if not isinstance(sentence, str):
+        sentence = str(sentence)
+
+    tokens = []
+    for s in simple_sentence_tokenize(sentence):
+        tokens.extend(word_tokenizer.tokenize(s))
+    # strip punctuation + lowercase
+    tokens = [tok.translate(_PUNCT_TABLE).lower() for tok in tokens]
+    return [t for t in tokens if t]
+
+
+# ------------- file parsing ------------- #
+
+def read_word_list(path: Path) -> frozenset:
+    """One lowercased word per line (stopwords, negations)."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+def read_emotion_list(path: Path) -> frozenset:
+    """
+    Emotion word list, normalized like caption tokens (lowercase, no
+    punctuation: 'Aha-Erlebnis' -> 'ahaerlebnis'). Multi-word entries can
+    never equal a single token and are dropped.
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        words = (line.strip().translate(_PUNCT_TABLE).lower() for line in f)
+        return frozenset(w for w in words if w and " " not in w)
+
+
+def read_sentiws(path: Path) -> dict:
+    """
+    Parse a SentiWS file into {surface form: score}.
+
+    Line format: Lemma|POS<TAB>score<TAB>inflection1,inflection2,...
+    Every lemma and inflection of a line maps to the line's score, once per
+    line. A form listed on several lines (e.g. as a noun and as an
+    adjective) keeps the rule of the old per-line scan: neither the first
+    nor the last line wins, the form gets the sum of their scores, added in
+    file order (so the same floats as before).
+
+    Two parsing differences to the old scan: the POS tag after "|" is not a
+    form (the old scan also matched tokens like "nn" or "adjx"), and a BOM
+    does not hide the first lemma of the file.
+    """
+    table = {}
+    with open(path, "r", encoding="utf-8-sig") as sentis:
+        for s in sentis:  # file order: the order the scores are summed in
+            cells = s.rstrip("\n").split("\t")
+            if len(cells) < 2:
+                continue
+            lemma = cells[0].split("|")[0].strip().lower()
+            value = float(cells[1].strip())
+            forms = {lemma}
+            if len(cells) > 2:
+                forms.update(w.strip().lower() for w in cells[2].split(",") if w.strip())
+            for form in forms:
+                # sum, not first/last wins (see above)
+                table[form] = table.get(form, 0.0) + value
+    return table
+
+
+# ------------- lexicon ------------- #
+
+class SentimentLexicon:
+    """
+    Compiled lexicon: a sorted array of surface forms with aligned positive
+    and negative score arrays and an emotion bitmask (bit i = emotion i of
+    emotion_names), plus sorted stopword and negation arrays.
+    The arrays may be memory-mapped from the binary cache; the dict/set
+    views used for per-caption scoring are built lazily on first use.
+    """
+
+    def __init__(self, forms, positive, negative, emotions, emotion_names, stopwords, negations,
+                 source_hash=None):
+        self.forms = forms
+        self.positive = positive
+        self.negative = negative
+        self.emotions = emotions
+        self.emotion_names = emotion_names
+        self.stopword_array = stopwords
+        self.negation_array = negations
+        self.source_hash = source_hash
+        self._tables = None
+        self._stopwords = None
+        self._negations = None
+
+    @classmethod
+    def from_folder(cls, folder: Path = DATA_FOLDER) -> "SentimentLexicon":
+        """Parse the SentiWS text files (the slow path)."""
+        folder = Path(folder)
+        pos = read_sentiws(folder / POSITIVE_FILE)
+        neg = read_sentiws(folder / NEGATIVE_FILE)
+        emotion_sets = [read_emotion_list(folder / f) for f in EMOTION_FILES.values()]
+        forms = sorted(set(pos).union(neg, *emotion_sets))
+        return cls(
+            forms=np.array(forms, dtype=str),
+            positive=np.array([pos.get(f, 0.0) for f in forms], dtype=np.float64),
+            negative=np.array([neg.get(f, 0.0) for f in forms], dtype=np.float64),
+            emotions=np.array(
+                [sum(1 << i for i, words in enumerate(emotion_sets) if f in words) for f in forms],
+                dtype=np.uint8,
+            ),
+            emotion_names=np.array(list(EMOTION_FILES), dtype=str),
+            stopwords=np.array(sorted(read_word_list(folder / STOPWORD_FILE)), dtype=str),
+            negations=np.array(sorted(read_word_list(folder / NEGATION_FILE)), dtype=str),
+            source_hash=source_hash(folder),
+        )
+
+    @property
+    def tables(self) -> dict:
+        if self._tables is None:
+            forms = self.forms.tolist()
+            self._tables = {}
+            for name, scores in ((POSITIVE_FILE, self.positive), (NEGATIVE_FILE, self.negative)):
+                self._tables[name] = {f: v for f, v in zip(forms, scores.tolist()) if v != 0.0}
+        return self._tables
+
+    @property
+    def max_key_length(self) -> int:
+        """Longest form, stopword or negation (the width of their '<U' arrays)."""
+        arrays = (self.forms, self.stopword_array, self.negation_array)
+        return max(a.dtype.itemsize // np.dtype("<U1").itemsize for a in arrays)
+
+    @property
+    def stopwords(self) -> frozenset:
+        if self._stopwords is None:
+            self._stopwords = frozenset(self.stopword_array.tolist())
+        return self._stopwords
+
+    @property
+    def negations(self) -> frozenset:
+        if self._negations is None:
+            self._negations = frozenset(self.negation_array.tolist())
+        return self._negations
+
+    def tokenize(self, text) -> list:
+        """Tokenize, strip punctuation, lowercase and drop stopwords."""
+        return [t for t in treebank_tokenizer(text) if t not in self.stopwords]
+
+    def polarity(self, tokens: list, dict_filename: str) -> float:
+        """Sum of lexicon scores over tokens, flipped/halved next to a negation."""
+        table = self.tables[dict_filename]
+        negs = self.negations
+        last = len(tokens) - 1
+        value = 0.0
+        for idx, tok in enumerate(tokens):
+            score = table.get(tok)
+            if score is None:
+                continue
+            if (idx > 0 and tokens[idx - 1] in negs) or (idx < last and tokens[idx + 1] in negs):
+                score *= NEGATION_FACTOR
+            value += score
+        return value
+
+    def score(self, text) -> float:
+        """Positive + negative polarity, rounded to 2 decimals and clamped to [-1, 1]."""
+        tokens = self.tokenize(text)
+        value = round(
+            self.polarity(tokens, POSITIVE_FILE) + self.polarity(tokens, NEGATIVE_FILE), 2
+        )
+        return max(min(value, 1.0), -1.0)
+
+    def analyze_batch(self, texts) -> dict:
+        """
+        Vectorized scoring of a whole column of captions in one token pass.
+
+        Captions are tokenized one by one (the treebank tokenizer is regex
+        based), then all tokens go into one flat array: stopwords, lexicon
+        scores and emotion bits are resolved with searchsorted lookups, the
+        +-1 token negation window is a shifted comparison that never crosses
+        caption boundaries, and per-caption sums come from bincount.
+
+        Returns {SENTIMENT_COLUMN: float64 polarity identical to score(),
+        emotion_<name>: int64 count of that emotion's words} aligned with texts.
+        """
+        token_lists = [treebank_tokenizer(t) for t in texts]
+        n = len(token_lists)
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=n)
+        # a token longer than every key matches nothing: it becomes '' (no
+        # list holds the empty string) and keeps its place for the negation
+        # window, so one long URL does not widen every token of the array
+        width = max(self.max_key_length, 1)
+        tokens = np.array(
+            [t if len(t) <= width else "" for t in chain.from_iterable(token_lists)], dtype=f"<U{width}",
+        )
+        doc = np.repeat(np.arange(n), lengths)
+
+        keep = ~_isin_sorted(tokens, self.stopword_array)
+        tokens, doc = tokens[keep], doc[keep]
+
+        idx = _lookup_sorted(tokens, self.forms)
+        hit = idx >= 0
+        pos = np.where(hit, self.positive[idx], 0.0)
+        neg = np.where(hit, self.negative[idx], 0.0)
+        emo = np.where(hit, self.emotions[idx], 0)
+
+        is_neg = _isin_sorted(tokens, self.negation_array)
+        same_doc = doc[1:] == doc[:-1]
+        negated = np.zeros(len(tokens), dtype=bool)
+        negated[1:] |= is_neg[:-1] & same_doc   # negation word right before
+        negated[:-1] |= is_neg[1:] & same_doc   # negation word right after
+        factor = np.where(negated, NEGATION_FACTOR, 1.0)
+
+        pos_sum = np.bincount(doc, weights=pos * factor, minlength=n)
+        neg_sum = np.bincount(doc, weights=neg * factor, minlength=n)
+        # built-in round() rounds the exact binary value (0.415 -> 0.41);
+        # np.round scales by 100 first and would give 0.42 on such ties
+        value = np.fromiter((round(v, 2) for v in (pos_sum + neg_sum).tolist()), dtype=np.float64, count=n)
+
+        result = {SENTIMENT_COLUMN: np.clip(value, -1.0, 1.0)}
+        for i, name in enumerate(self.emotion_names.tolist()):
+            has_emotion = (emo >> i) & 1
+            result[f"emotion_{name}"] = np.bincount(doc, weights=has_emotion, minlength=n).astype(np.int64)
+        return result
+
+    def score_batch(self, texts) -> np.ndarray:
+        """Clamped polarity only (see analyze_batch)."""
+        return self.analyze_batch(texts)[SENTIMENT_COLUMN]
+
+    def arrays(self) -> dict:
+        return {
+            "forms": self.forms,
+            "positive": self.positive,
+            "negative": self.negative,
+            "emotions": self.emotions,
+            "emotion_names": self.emotion_names,
+            "stopwords": self.stopword_array,
+            "negations": self.negation_array,
+        }
+
+
+def _lookup_sorted(values: np.ndarray, sorted_keys: np.ndarray) -> np.ndarray:
+    """Index of each value in sorted_keys, or -1 if it is not there."""
+    if len(sorted_keys) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    idx = np.searchsorted(sorted_keys, values)
+    idx[idx == len(sorted_keys)] = 0
+    return np.where(sorted_keys[idx] == values, idx, -1)
+
+
+def _isin_sorted(values: np.ndarray, sorted_keys: np.ndarray) -> np.ndarray:
+    return _lookup_sorted(values, sorted_keys) >= 0
+
+
+# ------------- binary cache ------------- #
+
+def source_hash(folder: Path = DATA_FOLDER) -> str:
+    """sha256 over the lexicon source files; changes whenever a list is edited."""
+    h = hashlib.sha256()
+    for name in SOURCE_FILES:
+        h.update(name.encode("utf-8") + b"\0")
+        h.update((Path(folder) / name).read_bytes())
+    return h.hexdigest()
+
+
+def _aligned(n: int) -> int:
+    return (n + _CACHE_ALIGN - 1) // _CACHE_ALIGN * _CACHE_ALIGN
+
+
+def save_binary(lexicon: SentimentLexicon, path: Path):
+    """
+    Layout: magic | uint32 header length | JSON header | aligned raw arrays.
+    The header records the format version, the source hash and the dtype,
+    shape and byte offset of every array. Written to a temp file and moved
+    into place so concurrent readers never see a half-written cache.
+    """
+    arrays = {k: np.ascontiguousarray(v) for k, v in lexicon.arrays().items()}
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _aligned(offset + arr.nbytes)
+    header = json.dumps({
+        "format_version": CACHE_FORMAT_VERSION,
+        "source_hash": lexicon.source_hash,
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = _aligned(len(CACHE_MAGIC) + 4 + len(header))
+
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(np.uint32(len(header)).tobytes())
+        f.write(header)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(arr.tobytes())
+    os.replace(tmp, path)
+
+
+def load_binary(path: Path, expected_hash: str = None):
+    """
+    Memory-map a cache written by save_binary. Returns None if the file is
+    missing, truncated or corrupt, has another format version or was built
+    from other sources.
+    """
+    path = Path(path)
+    if not path.exists() or path.stat().st_size < len(CACHE_MAGIC) + 4:
+        # np.memmap cannot map an empty file
+        return None
+    try:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(buf[:len(CACHE_MAGIC)]) != CACHE_MAGIC:
+            return None
+        pos = len(CACHE_MAGIC)
+        header_len = int(buf[pos:pos + 4].view(np.uint32)[0])
+        if pos + 4 + header_len > len(buf):
+            return None
+        header = json.loads(bytes(buf[pos + 4:pos + 4 + header_len]).decode("utf-8"))
+        if header.get("format_version") != CACHE_FORMAT_VERSION:
+            return None
+        if expected_hash is not None and header.get("source_hash") != expected_hash:
+            return None
+
+        data_start = _aligned(pos + 4 + header_len)
+        arrays = {}
+        for name, meta in header["arrays"].items():
+            dtype = np.dtype(meta["dtype"])
+            count = int(np.prod(meta["shape"]))
+            start = data_start + meta["offset"]
+            end = start + count * dtype.itemsize
+            # every array must lie inside the file (a truncated write would not)
+            if end > len(buf):
+                return None
+            arrays[name] = buf[start:end].view(dtype).reshape(meta["shape"])
+        return SentimentLexicon(source_hash=header["source_hash"], **arrays)
+    except (ValueError, KeyError, IndexError, TypeError, json.JSONDecodeError, UnicodeDecodeError):
+        # corrupt cache: load_lexicon falls back to the text files and rewrites it
+        return None
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(folder: Path = DATA_FOLDER) -> SentimentLexicon:
+    """
+    Load the lexicon once per process: memory-map the binary cache if it
+    matches the current source files, otherwise parse the text files and
+    (re)write the cache.
+    """
+    folder = Path(folder)
+    cache_path = folder / CACHE_FILE
+    lexicon = load_binary(cache_path, expected_hash=source_hash(folder))
+    if lexicon is not None:
+        return lexicon
+
+    lexicon = SentimentLexicon.from_folder(folder)
+    try:
+        save_binary(lexicon, cache_path)
+    except OSError as e:
+        # read-only checkout: keep working from the parsed text files
+        print(f"Could not write lexicon cache {cache_path}: {e}")
+    return lexicon
+
+
+def score_batch(texts, folder: Path = DATA_FOLDER) -> np.ndarray:
+    """Clamped rule-based sentiment for every caption in texts."""
+    return load_lexicon(folder).score_batch(texts)
+
+
+def _analyze_chunk(texts, folder):
+    return load_lexicon(folder).analyze_batch(texts)
+
+
+def analyze_parallel(texts, workers: int = 1, folder: Path = DATA_FOLDER, chunk_size: int = None) -> dict:
+    """
+    analyze_batch() over a process pool. texts are cut into contiguous
+    chunks, each worker memory-maps the shared binary lexicon once, and the
+    chunk results are concatenated in input order, so the output is
+    identical to a serial analyze_batch() call.
+    """
+    texts = list(texts)
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        # a few chunks per worker keeps the pool busy when captions vary in length
+        chunk_size = max(256, -(-len(texts) // (workers * 4)))
+    if workers == 1 or len(texts) <= chunk_size:
+        return load_lexicon(folder).analyze_batch(texts)
+
+    # build/refresh the binary cache here so the workers only ever map it
+    load_lexicon(folder)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_lexicon, initargs=(folder,)) as pool:
+        parts = list(pool.map(_analyze_chunk, chunks, [folder] * len(chunks)))
+    return {col: np.concatenate([p[col] for p in parts]) for col in parts[0]}
+
+
+def score_parallel(texts, workers: int = 1, folder: Path = DATA_FOLDER, chunk_size: int = None) -> np.ndarray:
+    """Polarity only (see analyze_parallel)."""
+    return analyze_parallel(texts, workers, folder, chunk_size)[SENTIMENT_COLUMN]
@@ -1,6 +1,5 @@
 import pandas as pd
-import glob
-import os
+import sys
 from pathlib import Path
 from scipy.stats import mannwhitneyu
 import numpy as np
@@ -10,40 +9,31 @@ import statsmodels.formula.api as smf
 # ---------------- CONFIG ----------------
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
-INSTAGRAM_FOLDER = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN"
-TIKTOK_FOLDER = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN"
+COLUMNS = ["engagement_score", "voting.topic"]
 
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from post_table import load_posts, print_memory  # noqa: E402
+# topics and bits of the voting.topic labels (topics.json, next to this script)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from topic_labels import TopicSet  # noqa: E402
 
-# ---------------- LOAD DATA ----------------
-
-def load_platform(path):
-    files = glob.glob(os.path.join(path, "*.csv"))
-    dfs = []
-    for f in files:
-        df = pd.read_csv(f)
-        df["party_file"] = os.path.basename(f)
-        dfs.append(df)
-    return pd.concat(dfs, ignore_index=True)
+TOPICS = TopicSet.load()
 
-tiktok = load_platform(TIKTOK_FOLDER)
-instagram = load_platform(INSTAGRAM_FOLDER)
 
-tiktok["platform"] = "tiktok"
-instagram["platform"] = "instagram"
+# ---------------- LOAD DATA ----------------
 
-df = pd.concat([tiktok, instagram], ignore_index=True)
+# compact typed posts of both platforms, with party, party_file and platform
+df = load_posts(["tiktok", "instagram"], columns=COLUMNS)
+print_memory(df)
 
 df = df.dropna(subset=["engagement_score", "voting.topic"])
+df["engagement_score"] = df["engagement_score"].astype("float64")  # float32-rounded in the post table; upcast only for the statistics routines
 
 
 # ---------------- VOTING CATEGORIES ----------------
 
-df["voting_cat"] = df["voting.topic"].map({
-    0: "none",
-    1: "eid_only",
-    2: "eigenmietwert_only",
-    3: "both"
-})
+# none / eid_only / eigenmietwert_only / eid+eigenmietwert / ... from the topic bits
+df["voting_cat"] = TOPICS.combination(df["voting.topic"])
 
 
 # ---------------- DESCRIPTIVES ----------------
@@ -54,7 +44,7 @@ print(df.groupby("voting_cat")["engagement_score"].describe())
 
 print("\n--- Combined voting (1,2,3) vs non-voting (0) ---")
 
-df["is_any_voting"] = (df["voting.topic"] > 0).astype(int)
+df["is_any_voting"] = TOPICS.has(df["voting.topic"]).astype(int)
 
 voting_all = df.loc[df.is_any_voting == 1, "engagement_score"]
 non_voting = df.loc[df.is_any_voting == 0, "engagement_score"]
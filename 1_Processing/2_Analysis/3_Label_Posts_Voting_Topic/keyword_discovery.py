@@ -0,0 +1,268 @@
+import argparse
+import hashlib
+import heapq
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Candidate keywords for the topic dictionaries (topics.json).
+# Streams every caption once, party by party from the store, and counts in
+# how many posts each word and word pair (n-gram) occurs: separately for
+# the posts of every topic, for all labeled posts ("any") and for the
+# unlabeled ones. Memory stays bounded whatever the vocabulary: each group
+# keeps a count-min sketch (depth x width counters; a term's count is the
+# minimum of its counters, never too low) plus the k most frequent terms
+# seen so far (heavy hitters, ranked by their sketch count).
+#
+# Candidates of a topic are its heavy hitters ranked by lift:
+#   share of the topic's posts with the term / share of unlabeled posts with it
+# (add-one smoothed). Terms containing a keyword of any topic are left out:
+# unlabeled posts contain no keyword by construction, so every keyword
+# would rank at the top of every topic.
+#
+#   python keyword_discovery.py                    # candidates for every topic
+#   python keyword_discovery.py --topic eid --ngrams 3 --top 50
+
+# ------------ CONFIG ------------ #
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import parties, read_party  # noqa: E402
+# topics and platform registry of the labeling (label_posts.py, next to this script)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from label_posts import LABEL_COLUMN, LABEL_PLATFORMS, TOPICS  # noqa: E402
+
+STOPWORD_FILE = PROJECT_ROOT / "1_Processing" / "2_Analysis" / "1_Caption_Sentiment" / "data" / "stopWords.txt"
+
+ANY_TOPIC = "any"
+UNLABELED = "unlabeled"
+
+# words, with inner hyphens ("e-id")
+TOKEN_PATTERN = re.compile(r"\w+(?:-\w+)*")
+
+DEFAULTS = {
+    "width": 2 ** 16,   # counters per sketch row
+    "depth": 4,         # sketch rows (independent hashes)
+    "k": 2000,          # heavy hitters kept per group
+    "ngrams": 2,        # longest n-gram
+    "min_posts": 3,     # a candidate occurs in at least this many posts of the topic
+}
+
+
+def read_stopwords(path: Path = STOPWORD_FILE) -> frozenset:
+    """One lowercased word per line (as sentiment_lexicon.read_word_list)."""
+    if not path.exists():
+        return frozenset()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+def post_terms(text, n_max: int, stopwords: frozenset) -> set:
+    """
+    Distinct n-grams (1..n_max) of a caption, over the tokens of at least two
+    characters that are not just digits; n-grams starting or ending with a
+    stopword are skipped.
+    """
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return set()
+    tokens = [t for t in TOKEN_PATTERN.findall(str(text).lower()) if len(t) > 1 and not t.isdigit()]
+    terms = set()
+    for n in range(1, n_max + 1):
+        for i in range(len(tokens) - n + 1):
+            if tokens[i] in stopwords or tokens[i + n - 1] in stopwords:
+                continue
+            terms.add(" ".join(tokens[i:i + n]))
+    return terms
+
+
+# ------------ SKETCHES ------------ #
+
+def sketch_columns(term: str, width: int, depth: int) -> np.ndarray:
+    """One counter per sketch row, from one 64-bit hash (h1 + i * h2, Kirsch-Mitzenmacher)."""
+    digest = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+    h1, h2 = digest & 0xFFFFFFFF, (digest >> 32) | 1
+    return (h1 + np.arange(depth) * h2) % width
+
+
+class CountMinSketch:
+    """
+    depth x width counters; add() raises the term's counter in every row
+    (conservative update: only as far as needed), estimate() is the minimum.
+    """
+
+    def __init__(self, width: int = DEFAULTS["width"], depth: int = DEFAULTS["depth"]):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def columns(self, term: str) -> np.ndarray:
+        return sketch_columns(term, self.width, self.depth)
+
+    def add(self, term: str, count: int = 1, columns: np.ndarray = None) -> int:
+        """Count term and return its new estimate."""
+        columns = self.columns(term) if columns is None else columns
+        current = self.table[self._rows, columns]
+        estimate = int(current.min()) + count
+        self.table[self._rows, columns] = np.maximum(current, estimate)
+        return estimate
+
+    def estimate(self, term: str, columns: np.ndarray = None) -> int:
+        columns = self.columns(term) if columns is None else columns
+        return int(self.table[self._rows, columns].min())
+
+
+class HeavyHitters:
+    """The k terms with the highest sketch counts, kept in a min-heap (stale entries are skipped lazily)."""
+
+    def __init__(self, k: int = DEFAULTS["k"]):
+        self.k = k
+        self.counts = {}
+        self._heap = []
+
+    def update(self, term: str, estimate: int):
+        if term in self.counts or len(self.counts) < self.k:
+            self.counts[term] = estimate
+            heapq.heappush(self._heap, (estimate, term))
+        else:
+            smallest = self._smallest()
+            if estimate <= smallest[0]:
+                return
+            heapq.heappop(self._heap)
+            del self.counts[smallest[1]]
+            self.counts[term] = estimate
+            heapq.heappush(self._heap, (estimate, term))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, term) for term, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _smallest(self) -> tuple:
+        while True:
+            count, term = self._heap[0]
+            if self.counts.get(term) == count:
+                return count, term
+            heapq.heappop(self._heap)
+
+    def top(self, n: int = None) -> list:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+class TermCounter:
+    """Posts per term of one group of posts: a count-min sketch plus its heavy hitters."""
+
+    def __init__(self, width: int, depth: int, k: int):
+        self.sketch = CountMinSketch(width, depth)
+        self.heavy = HeavyHitters(k)
+        self.n_posts = 0
+
+    def add_post(self, terms: dict):
+        """terms: term -> sketch columns (hashed once per post for all groups)."""
+        self.n_posts += 1
+        for term, columns in terms.items():
+            self.heavy.update(term, self.sketch.add(term, columns=columns))
+
+
+# ------------ DISCOVERY ------------ #
+
+class KeywordDiscovery:
+    """
+    Streaming term counts per topic, all labeled posts and unlabeled posts.
+
+        discovery = KeywordDiscovery()
+        discovery.add("Nein zur E-ID am 28. September", 1)
+        discovery.candidates("eid")
+    """
+
+    def __init__(self, topics=TOPICS, width: int = DEFAULTS["width"], depth: int = DEFAULTS["depth"],
+                 k: int = DEFAULTS["k"], n_max: int = DEFAULTS["ngrams"], stopwords: frozenset = None):
+        self.topics = topics
+        self.n_max = n_max
+        self.stopwords = read_stopwords() if stopwords is None else stopwords
+        self.width, self.depth = width, depth
+        self.groups = {name: TermCounter(width, depth, k) for name in [*topics.names, ANY_TOPIC, UNLABELED]}
+
+    def add(self, text, code):
+        terms = post_terms(text, self.n_max, self.stopwords)
+        hashed = {term: sketch_columns(term, self.width, self.depth) for term in terms}
+        names = [n for n in self.topics.decode(0 if pd.isna(code) else code) if n in self.groups]
+        for name in [*names, ANY_TOPIC] if names else [UNLABELED]:
+            self.groups[name].add_post(hashed)
+
+    def add_frame(self, df: pd.DataFrame, text_column: str, label_column: str = LABEL_COLUMN):
+        for text, code in zip(df[text_column].tolist(), df[label_column].tolist()):
+            self.add(text, code)
+
+    def _keywords(self) -> list:
+        # keywords of every topic: unlabeled posts contain none of them, so
+        # any keyword would get the highest lift for any topic
+        keywords = []
+        for t in self.topics.topics:
+            keywords += [kw if isinstance(kw, str) else kw[0] for kw in t["keywords"]]
+        return [kw.lower() for kw in keywords]
+
+    def candidates(self, topic: str = ANY_TOPIC, top: int = 30, min_posts: int = DEFAULTS["min_posts"],
+                   include_keywords: bool = False) -> pd.DataFrame:
+        """Heavy hitters of a topic ranked by lift over the unlabeled posts."""
+        group, unlabeled = self.groups[topic], self.groups[UNLABELED]
+        keywords = [] if include_keywords else self._keywords()
+        rows = []
+        for term, n_topic in group.heavy.top():
+            if n_topic < min_posts or any(kw in term for kw in keywords):
+                continue
+            n_unlabeled = unlabeled.sketch.estimate(term)
+            share_topic = (n_topic + 1) / (group.n_posts + 1)
+            share_unlabeled = (n_unlabeled + 1) / (unlabeled.n_posts + 1)
+            rows.append({
+                "term": term, "posts_topic": n_topic, "posts_unlabeled": n_unlabeled,
+                "share_topic": share_topic, "share_unlabeled": share_unlabeled,
+                "lift": share_topic / share_unlabeled,
+            })
+        columns = ["term", "posts_topic", "posts_unlabeled", "share_topic", "share_unlabeled", "lift"]
+        out = pd.DataFrame(rows, columns=columns)
+        return out.sort_values(["lift", "posts_topic"], ascending=False).head(top).reset_index(drop=True)
+
+    def memory_bytes(self) -> int:
+        """Counters of all sketches (the heavy-hitter lists hold at most k terms per group)."""
+        return sum(g.sketch.table.nbytes for g in self.groups.values())
+
+
+def discover_from_store(platforms=None, **kwargs) -> KeywordDiscovery:
+    """Feed every labeled caption of the clean store, one party at a time."""
+    discovery = KeywordDiscovery(**kwargs)
+    for platform in platforms or LABEL_PLATFORMS:
+        text_column = LABEL_PLATFORMS[platform]["text_column"]
+        for party in parties(platform):
+            df = read_party(platform, party, [text_column, LABEL_COLUMN])
+            if df is None or text_column not in df.columns or LABEL_COLUMN not in df.columns:
+                continue
+            discovery.add_frame(df, text_column)
+    return discovery
+
+
+# ------------ MAIN ------------ #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank candidate keywords for the voting topics by lift.")
+    parser.add_argument("--topic", choices=[*TOPICS.names, ANY_TOPIC], help="default: every topic")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--ngrams", type=int, default=DEFAULTS["ngrams"])
+    parser.add_argument("--min-posts", type=int, default=DEFAULTS["min_posts"])
+    parser.add_argument("--width", type=int, default=DEFAULTS["width"])
+    parser.add_argument("--depth", type=int, default=DEFAULTS["depth"])
+    parser.add_argument("-k", type=int, default=DEFAULTS["k"], help="heavy hitters kept per group")
+    args = parser.parse_args()
+
+    discovery = discover_from_store(width=args.width, depth=args.depth, k=args.k, n_max=args.ngrams)
+    sizes = ", ".join(f"{name}={g.n_posts}" for name, g in discovery.groups.items())
+    print(f"Posts per group: {sizes}; sketches {discovery.memory_bytes() / 2 ** 20:.1f} MB")
+    with pd.option_context("display.width", 200, "display.max_rows", 200):
+        for topic in [args.topic] if args.topic else [*TOPICS.names, ANY_TOPIC]:
+            table = discovery.candidates(topic, top=args.top, min_posts=args.min_posts)
+            print(f"\n--- Candidate keywords for '{topic}' (lift over unlabeled posts) ---")
+            print(table.to_string(index=False, float_format=lambda x: f"{x:.3f}") if len(table) else "none")
@@ -1,221 +1,179 @@
-import pandas as pd
+import argparse
 import os
-import glob
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
 
 #vlt basic topic modeling um themen cluster zu identifizieren und word frequency um herauszufinden was noch dazuzählen könnte - erleichtert einordnung
 # vlt diese auch noch ein label geben:  "abstimmung", "stimmen", "stimmt", "volksabstimmung"
-# --- TIKTOK DATA ---
+# -> keyword_discovery.py: häufige Wörter/Wortpaare pro Thema, nach Lift gegenüber nicht gelabelten Posts
+
+# Voting-topic labels of the clean posts of every platform.
+# One engine for all platforms: the registry below maps a platform to its
+# clean CSV folder and caption column, the topics and keywords are loaded
+# and compiled once from topics.json, and the files of both platforms are
+# labeled in one run, spread over a process pool (the workers inherit the
+# compiled topics). With --changed-only, only the rows the last cleaning run
+# added or updated (ingest manifests) and rows without a label are labeled;
+# files without such rows are not rewritten.
+#
+#   python label_posts.py                       # both platforms, all cores
+#   python label_posts.py --platform tiktok --workers 1
+#   python label_posts.py --changed-only        # after an incremental clean_exports.py run
 
 
 # --- Configuration ---
-# Define the path where your CSV files are located
-DATA_PATH = 'A_Data/1_Tiktok/2_CLEAN'
-# Define the column to search in
-TEXT_COLUMN = 'data.desc'
-# Define the new column to be added
-LABEL_COLUMN = 'voting.topic'
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import ID_COLUMN, PLATFORMS, party_of, update_columns  # noqa: E402
+# ids changed by the last cleaning run (1_Data_cleaning/ingest_manifest.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing" / "1_Data_cleaning"))
+from ingest_manifest import changed_ids  # noqa: E402
+# topics, keywords and bits from topics.json (topic_labels.py, next to this script)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from topic_labels import TopicSet  # noqa: E402
+
+# The topics and their keywords live in topics.json: every topic owns one bit
+# of the label (E-ID = 1, Eigenmietwert = 2, both = 3, a next vote = 4, ...)
+TOPICS = TopicSet.load().compile()
+# Define the new column to be added
+LABEL_COLUMN = TOPICS.column
+
+# Define where the CSV files of every platform are and which column to search
+LABEL_PLATFORMS = {
+    "tiktok": {
+        "data_path": PLATFORMS["tiktok"]["clean_dir"],
+        "text_column": "data.desc",
+    },
+    "instagram": {
+        "data_path": PLATFORMS["instagram"]["clean_dir"],
+        "text_column": "data.caption.text",
+    },
+}
 
 
-# Define a dictionary where keys are the labels and values are lists of keywords
-# All keywords must be in lowercase.
-TOPIC_KEYWORDS = {
-    # Label 1: E-ID
-    1: ["e-id", "eid", "e id", "elektronische identität", "privatsphäre", "überwachung"],
-    
-    # Label 2: Eigenmietwert
-    2: ["eigenmietwert", "mietwert", "wohneigentumsbesteuerung", "eigenmietwertbesteuerung"]
-}
+# --- Labeling ---
 
 def label_data_topic(text):
     """
-    Checks the text for voting topics and assigns a label:
-    - 3 if keywords for BOTH Topic 1 (E-ID) and Topic 2 (Eigenmietwert) are present.
-    - 1 if only Topic 1 keywords are present.
-    - 2 if only Topic 2 keywords are present.
-    - 0 if neither are present.
+    Checks the text for voting topics and returns the bitwise OR of the bit
+    of every topic whose keywords occur (0 if none). The topics, keywords
+    and bits, and so the codes, are defined in topics.json.
     """
-    if pd.isna(text):
-        # Handle NaN/missing values
-        return 0
-    
-    # Convert the text to lowercase for case-insensitive checking
-    text_lower = str(text).lower()
-    
-    # --- Step 1: Check for the presence of each topic individually ---
-    
-    # Check if ANY keyword for Topic 1 (E-ID) is in the text
-    topic_1_present = any(keyword in text_lower for keyword in TOPIC_KEYWORDS.get(1, []))
-    
-    # Check if ANY keyword for Topic 2 (Eigenmietwert) is in the text
-    topic_2_present = any(keyword in text_lower for keyword in TOPIC_KEYWORDS.get(2, []))
-    
-    # --- Step 2: Assign the final label based on the presence check ---
-
-    # 1. If BOTH are present, return 3
-    if topic_1_present and topic_2_present:
-        return 3
-    
-    # 2. If ONLY Topic 1 is present, return 1
-    elif topic_1_present:
-        return 1
-    
-    # 3. If ONLY Topic 2 is present, return 2
-    elif topic_2_present:
-        return 2
-    
-    # 4. If neither is present, return 0
-    else:
-        return 0
-
-def process_csv_files(directory):
+    # One case-insensitive pass over the text for every keyword of every topic
+    # (missing text has no topics)
+    return TOPICS.label(text)
+
+
+def label_file(platform: str, file_path, changed: set = None) -> dict:
     """
-    Finds all CSV files in the given directory and applies the labeling function 
-    to the specified column, then overwrites the original file.
+    Adds/updates the label column of one CSV file, overwrites the file and
+    pushes the column to the store. With a set of changed ids, only those
+    rows and rows without a label are labeled (nothing is written if there
+    are none). Returns what happened, for the report.
     """
-    # Use glob to find all files ending with .csv in the directory
-    search_path = os.path.join(directory, '*.csv')
-    csv_files = glob.glob(search_path)
-    
-    if not csv_files:
-        print(f"⚠️ No CSV files found in the directory: {directory}")
-        return
-
-    print(f"📂 Found {len(csv_files)} CSV files. Starting processing...")
-
-    for file_path in csv_files:
-        print(f"\n--- Processing: {os.path.basename(file_path)} ---")
-        
-        try:
-            # 1. Read the CSV file
-            df = pd.read_csv(file_path)
-            
-            # Check if the required column exists
-            if TEXT_COLUMN not in df.columns:
-                print(f"❌ Column '{TEXT_COLUMN}' not found in the file. Skipping.")
-                continue
-
-            # 2. Apply the labeling function to the specified column
-            df[LABEL_COLUMN] = df[TEXT_COLUMN].apply(label_data_topic)
-            
+    start = time.perf_counter()
+    text_column = LABEL_PLATFORMS[platform]["text_column"]
+    result = {"platform": platform, "file": os.path.basename(file_path), "rows": 0, "voting": 0, "status": "ok"}
+    try:
+        # 1. Read the CSV file
+        df = pd.read_csv(file_path)
+
+        # Check if the required column exists
+        if text_column not in df.columns:
+            result["status"] = f"column '{text_column}' not found"
+        else:
+            # 2. Label the whole column at once (the labels of label_data_topic)
+            if changed is None or LABEL_COLUMN not in df.columns:
+                df[LABEL_COLUMN] = TOPICS.label_column(df[text_column])
+            else:
+                rows = df[ID_COLUMN].astype(str).isin(changed) | df[LABEL_COLUMN].isna()
+                if not rows.any():
+                    result["status"] = "up to date"
+                    result["seconds"] = time.perf_counter() - start
+                    return result
+                df.loc[rows, LABEL_COLUMN] = TOPICS.label_column(df.loc[rows, text_column])
+                df[LABEL_COLUMN] = df[LABEL_COLUMN].astype("Int64")
+                result["relabeled"] = int(rows.sum())
+
             # 3. Save the modified DataFrame back to the original file
             df.to_csv(file_path, index=False)
-            
-            print(f"✅ Successfully added/updated '{LABEL_COLUMN}' column and saved the file.")
-            
-        except Exception as e:
-            print(f"🚨 An error occurred while processing {os.path.basename(file_path)}: {e}")
+            update_columns(df, platform, party_of(file_path), [LABEL_COLUMN])
+            result["rows"] = len(df)
+            result["voting"] = int(TOPICS.has(df[LABEL_COLUMN]).sum())
 
-# --- Main execution block ---
-if __name__ == "__main__":
-    process_csv_files(DATA_PATH)
-    print("\n🚀 All CSV files have been processed.")
+    except Exception as e:
+        result["status"] = f"error: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
 
 
+def process_csv_files(platforms=None, workers: int = 1, changed_only: bool = False) -> list:
+    """
+    Labels every CSV file of the given platforms (default: all), largest
+    files first; workers > 1 spreads the files over a process pool.
+    changed_only limits each file to the rows of the last cleaning run.
+    """
+    jobs = []
+    for platform in platforms or LABEL_PLATFORMS:
+        data_path = Path(LABEL_PLATFORMS[platform]["data_path"])
+        csv_files = sorted(data_path.glob("*.csv"))
+        if not csv_files:
+            print(f"⚠️ No CSV files found in the directory: {data_path}")
+        changed = None
+        if changed_only:
+            changed = {account.rstrip("_"): set(ids) for account, ids in changed_ids(data_path).items()}
+        jobs += [
+            (path.stat().st_size, platform, path, None if changed is None else changed.get(party_of(path), set()))
+            for path in csv_files
+        ]
+    jobs.sort(key=lambda job: job[0], reverse=True)
+    print(f"📂 Found {len(jobs)} CSV files. Starting processing...")
+
+    if workers == 1 or len(jobs) <= 1:
+        return [label_file(platform, path, ids) for _, platform, path, ids in jobs]
+    with ProcessPoolExecutor(max_workers=workers or None) as pool:
+        futures = [pool.submit(label_file, platform, path, ids) for _, platform, path, ids in jobs]
+        return [f.result() for f in futures]
 
-# --- INSTAGRAM DATA ---
-
-# --- Configuration ---
-# Define the path where your CSV files are located
-DATA_PATH = 'A_Data/2_Instagram/2_CLEAN'
-# Define the column to search in
-TEXT_COLUMN = 'data.caption.text'
-# Define the new column to be added
-LABEL_COLUMN = 'voting.topic'
-
-# Define a dictionary where keys are the labels and values are lists of keywords
-# All keywords must be in lowercase.
 
-TOPIC_KEYWORDS = {
-    # Label 1: E-ID
-    1: ["e-id", "eid", "e id", "elektronische identität", "privatsphäre", "überwachung"],
-    
-    # Label 2: Eigenmietwert
-    2: ["eigenmietwert", "mietwert", "wohneigentumsbesteuerung", "eigenmietwertbesteuerung"]
-}
+# --- Main execution block ---
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Label the voting topics of the clean posts.")
+    parser.add_argument("--platform", choices=[*LABEL_PLATFORMS, "all"], default="all")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="number of worker processes (1 = serial, 0 = all cores)",
+    )
+    parser.add_argument(
+        "--changed-only", action="store_true",
+        help="only label the rows added/updated by the last cleaning run and rows without a label",
+    )
+    args = parser.parse_args(argv)
+    platforms = list(LABEL_PLATFORMS) if args.platform == "all" else [args.platform]
+
+    start = time.perf_counter()
+    results = process_csv_files(platforms, args.workers, args.changed_only)
+    for r in sorted(results, key=lambda r: (r["platform"], r["file"])):
+        label = f"{r['platform']:<9} {r['file']:<32}"
+        if r["status"] == "ok":
+            relabeled = f", {r['relabeled']} relabeled" if "relabeled" in r else ""
+            print(f"✅ {label} {r['rows']:5d} posts, {r['voting']:4d} on a voting topic{relabeled} ({r['seconds']:.2f}s)")
+        elif r["status"] == "up to date":
+            print(f"⏭️ {label} up to date")
+        elif r["status"].startswith("error"):
+            print(f"🚨 {label} {r['status']}")
+        else:
+            print(f"❌ {label} {r['status']}. Skipping.")
+    print(f"\n🚀 {len(results)} CSV files processed in {time.perf_counter() - start:.2f}s.")
 
-def label_data_topic(text):
-    """
-    Checks the text for voting topics and assigns a label:
-    - 3 if keywords for BOTH Topic 1 (E-ID) and Topic 2 (Eigenmietwert) are present.
-    - 1 if only Topic 1 keywords are present.
-    - 2 if only Topic 2 keywords are present.
-    - 0 if neither are present.
-    """
-    if pd.isna(text):
-        # Handle NaN/missing values
-        return 0
-    
-    # Convert the text to lowercase for case-insensitive checking
-    text_lower = str(text).lower()
-    
-    # --- Step 1: Check for the presence of each topic individually ---
-    
-    # Check if ANY keyword for Topic 1 (E-ID) is in the text
-    topic_1_present = any(keyword in text_lower for keyword in TOPIC_KEYWORDS.get(1, []))
-    
-    # Check if ANY keyword for Topic 2 (Eigenmietwert) is in the text
-    topic_2_present = any(keyword in text_lower for keyword in TOPIC_KEYWORDS.get(2, []))
-    
-    # --- Step 2: Assign the final label based on the presence check ---
-
-    # 1. If BOTH are present, return 3
-    if topic_1_present and topic_2_present:
-        return 3
-    
-    # 2. If ONLY Topic 1 is present, return 1
-    elif topic_1_present:
-        return 1
-    
-    # 3. If ONLY Topic 2 is present, return 2
-    elif topic_2_present:
-        return 2
-    
-    # 4. If neither is present, return 0
-    else:
-        return 0
-
-def process_csv_files(directory):
-    """
-    Finds all CSV files in the given directory and applies the labeling function 
-    to the specified column, then overwrites the original file.
-    """
-    # Use glob to find all files ending with .csv in the directory
-    search_path = os.path.join(directory, '*.csv')
-    csv_files = glob.glob(search_path)
-    
-    if not csv_files:
-        print(f"⚠️ No CSV files found in the directory: {directory}")
-        return
-
-    print(f"📂 Found {len(csv_files)} CSV files. Starting processing...")
-
-    for file_path in csv_files:
-        print(f"\n--- Processing: {os.path.basename(file_path)} ---")
-        
-        try:
-            # 1. Read the CSV file
-            df = pd.read_csv(file_path)
-            
-            # Check if the required column exists
-            if TEXT_COLUMN not in df.columns:
-                print(f"❌ Column '{TEXT_COLUMN}' not found in the file. Skipping.")
-                continue
-
-            # 2. Apply the labeling function to the specified column
-            df[LABEL_COLUMN] = df[TEXT_COLUMN].apply(label_data_topic)
-            
-            # 3. Save the modified DataFrame back to the original file
-            df.to_csv(file_path, index=False)
-            
-            print(f"✅ Successfully added/updated '{LABEL_COLUMN}' column and saved the file.")
-            
-        except Exception as e:
-            print(f"🚨 An error occurred while processing {os.path.basename(file_path)}: {e}")
 
-# --- Main execution block ---
 if __name__ == "__main__":
-    process_csv_files(DATA_PATH)
-    print("\n🚀 All CSV files have been processed.")
-
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+# Bulk voting-topic labeling of the whole corpus.
+# label_posts.py labels file by file. Here the captions of both platforms
+# are read from the store (post id and caption only), stacked into one
+# column and labeled in one vectorized pass (TopicSet.label_column: one
+# precompiled regex per topic over all captions). Only the label column is
+# written back: into each party's store partition and its clean CSV,
+# matched on data.id.
+#
+#   python label_posts_bulk.py              # label and write back
+#   python label_posts_bulk.py --dry-run    # label and print the counts only
+
+# ------------ CONFIG ------------ #
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import (  # noqa: E402
+    ID_COLUMN, PARTY_COLUMN, clean_csv_path, partition_path, read_clean, sync_party, update_columns,
+)
+# one topic engine and platform registry for all labeling (label_posts.py, next to this script)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from label_posts import LABEL_COLUMN, LABEL_PLATFORMS, TOPICS  # noqa: E402
+
+# caption column per platform
+TEXT_COLUMNS = {platform: config["text_column"] for platform, config in LABEL_PLATFORMS.items()}
+CAPTION_COLUMN = "caption"
+
+
+# ------------ LABELING ------------ #
+
+def read_captions(platforms=None) -> pd.DataFrame:
+    """platform, party, data.id and caption of every post, both platforms stacked."""
+    frames = []
+    for platform in platforms or TEXT_COLUMNS:
+        text_col = TEXT_COLUMNS[platform]
+        df = read_clean(platform, columns=[ID_COLUMN, text_col])
+        if text_col not in df.columns:
+            continue
+        frames.append(pd.DataFrame({
+            "platform": platform,
+            PARTY_COLUMN: df[PARTY_COLUMN].astype(str),
+            ID_COLUMN: df[ID_COLUMN],
+            CAPTION_COLUMN: df[text_col].astype("string"),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def label_corpus(captions: pd.DataFrame) -> pd.DataFrame:
+    captions[LABEL_COLUMN] = TOPICS.label_column(captions[CAPTION_COLUMN])
+    return captions
+
+
+def write_labels(labeled: pd.DataFrame):
+    """Label column of every party into its clean CSV and store partition."""
+    for (platform, party), group in labeled.groupby(["platform", PARTY_COLUMN], sort=True):
+        labels = group.drop_duplicates(ID_COLUMN, keep="last").set_index(ID_COLUMN)[LABEL_COLUMN]
+
+        csv_path = clean_csv_path(platform, party)
+        if csv_path.exists():
+            df = pd.read_csv(csv_path, dtype={ID_COLUMN: str})
+            new = df[ID_COLUMN].map(labels)
+            if LABEL_COLUMN in df.columns:
+                new = new.fillna(df[LABEL_COLUMN])
+            df[LABEL_COLUMN] = new.astype("Int64")
+            df.to_csv(csv_path, index=False)
+
+        if partition_path(platform, party).exists():
+            update_columns(group, platform, party, [LABEL_COLUMN])
+        else:
+            sync_party(platform, party)
+
+
+# ------------ MAIN ------------ #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Label the voting topics of all posts in one vectorized pass.")
+    parser.add_argument("--dry-run", action="store_true", help="label only, write nothing back")
+    args = parser.parse_args()
+
+    captions = read_captions()
+    start = time.perf_counter()
+    labeled = label_corpus(captions)
+    elapsed = time.perf_counter() - start
+    print(f"Labeled {len(labeled):,} captions in {elapsed * 1000:.1f} ms")
+    print(TOPICS.crosstab(labeled[LABEL_COLUMN], labeled["platform"]))
+
+    if not args.dry_run:
+        write_labels(labeled)
+        print(f"'{LABEL_COLUMN}' written back for {labeled.groupby(['platform', PARTY_COLUMN]).ngroups} parties.")
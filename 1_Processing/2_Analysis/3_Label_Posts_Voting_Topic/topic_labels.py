@@ -0,0 +1,229 @@
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from topic_matcher import TopicMatcher
+
+try:
+    import pyarrow  # noqa: F401  (Arrow string kernels for label_column)
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+ENGINE = "arrow" if HAVE_ARROW else "python"
+
+
+# Voting-topic labels as bitsets, driven by topics.json.
+# Every topic of the config owns one bit: the label of a post is the sum of
+# 1 << bit over the topics whose keywords it mentions, so N topics need no
+# special "both" codes. With E-ID on bit 0 and Eigenmietwert on bit 1 the
+# codes are the old ones (0 none, 1 E-ID, 2 Eigenmietwert, 3 both); a new
+# ballot measure is a new entry in the config with the next free bit.
+#
+# The helpers work on a whole label column at once (numpy bit operations):
+#   TOPICS = TopicSet.load()
+#   TOPICS.has(df["voting.topic"], "eid")                         # bool mask
+#   TOPICS.has(df["voting.topic"], "eid", "eigenmietwert", how="all")
+#   TOPICS.matrix(df["voting.topic"])                             # one bool column per topic
+#   TOPICS.counts(df["voting.topic"], by=df["party"])             # posts per topic and party
+#   TOPICS.crosstab(df["voting.topic"], df["platform"])           # posts per combination
+#   TOPICS.vote_day()                                             # shared vote_date of the topics
+#
+# label() scans one caption with the keyword automaton; label_column() labels
+# a whole caption column at once with one precompiled regex per topic, run
+# by Arrow's RE2 string kernels when pyarrow is installed (Python's re
+# otherwise). Both give the same labels.
+
+TOPICS_FILE = Path(__file__).resolve().parent / "topics.json"
+HOW = ("any", "all", "only")
+# characters that continue a word (topic_matcher: isalnum or "_"), per regex engine
+WORD_CHARS = {"arrow": r"\pL\pN_", "python": r"\w"}
+
+
+def keyword_regex(keyword: str, rule: str, engine: str) -> str:
+    """Regex for one keyword under a topic_matcher rule, without lookarounds (RE2 has none)."""
+    word = WORD_CHARS[engine]
+    left, right = f"(?:^|[^{word}])", f"(?:[^{word}]|$)"
+    keyword = re.escape(keyword.lower())
+    if rule == "word":
+        return left + keyword + right
+    if rule == "prefix":
+        return left + keyword
+    if rule == "suffix":
+        return keyword + right
+    return keyword
+
+
+class TopicSet:
+    """The topics of a config file, their bits and one compiled keyword matcher."""
+
+    def __init__(self, topics: list, column: str = "voting.topic", none_label: str = "Not a voting topic"):
+        self.topics = sorted(topics, key=lambda t: t["bit"])
+        self.column = column
+        self.none_label = none_label
+        self.names = [t["name"] for t in self.topics]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"duplicate topic names in {self.names}")
+        bits = [t["bit"] for t in self.topics]
+        if len(set(bits)) != len(bits) or not all(0 <= b < 63 for b in bits):
+            raise ValueError(f"topic bits must be distinct and in 0..62, got {bits}")
+        self.bits = {t["name"]: 1 << t["bit"] for t in self.topics}
+        self.labels = {t["name"]: t.get("label", t["name"]) for t in self.topics}
+        self.vote_dates = {t["name"]: t["vote_date"] for t in self.topics if "vote_date" in t}
+        self._matcher = None
+        self._patterns = {}  # engine -> [(bit, regex)]
+
+    @classmethod
+    def load(cls, path=TOPICS_FILE) -> "TopicSet":
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(
+            config["topics"],
+            column=config.get("column", "voting.topic"),
+            none_label=config.get("none_label", "Not a voting topic"),
+        )
+
+    def compile(self) -> "TopicSet":
+        """Build the keyword automaton and the column patterns now (e.g. before forking workers)."""
+        self.matcher
+        self.patterns(ENGINE)
+        return self
+
+    @property
+    def matcher(self) -> TopicMatcher:
+        # keywords are strings or [keyword, rule] pairs (see topic_matcher.RULES)
+        if self._matcher is None:
+            self._matcher = TopicMatcher({self.bits[t["name"]]: t["keywords"] for t in self.topics})
+        return self._matcher
+
+    # ------------ LABELING ------------ #
+
+    def label(self, text) -> int:
+        """Bitset of the topics mentioned in text (0 for none or missing text)."""
+        return sum(self.matcher.topics(text))
+
+    def label_series(self, texts: pd.Series) -> pd.Series:
+        return texts.map(self.label).astype("int64")
+
+    def patterns(self, engine: str) -> list:
+        """(bit, regex) per topic: the alternation of all its keywords, built once per engine."""
+        if engine not in self._patterns:
+            compiled = []
+            for topic in self.topics:
+                parts = []
+                for keyword in topic["keywords"]:
+                    keyword, rule = (keyword, "substring") if isinstance(keyword, str) else keyword
+                    parts.append(keyword_regex(keyword, rule, engine))
+                compiled.append((self.bits[topic["name"]], "|".join(parts)))
+            self._patterns[engine] = compiled
+        return self._patterns[engine]
+
+    def label_column(self, texts: pd.Series) -> pd.Series:
+        """
+        label() for a whole column at once: the text is lowercased once and
+        every topic is one vectorized regex search over all rows.
+        """
+        if ENGINE == "arrow":
+            lower = texts.astype("string[pyarrow]").str.lower()
+        else:
+            lower = texts.astype(object).where(texts.notna()).str.lower()
+        codes = np.zeros(len(texts), dtype="int64")
+        for bit, pattern in self.patterns(ENGINE):
+            hits = lower.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+            codes[hits] |= bit
+        return pd.Series(codes, index=texts.index)
+
+    def code(self, *names) -> int:
+        """Bitset of the given topic names."""
+        unknown = [n for n in names if n not in self.bits]
+        if unknown:
+            raise KeyError(f"unknown topics {unknown}, expected some of {self.names}")
+        return sum(self.bits[n] for n in set(names))
+
+    def decode(self, code: int) -> list:
+        """Topic names of one bitset; bits missing from the config come back as 'bit<k>'."""
+        code = int(code)
+        names = [n for n in self.names if code & self.bits[n]]
+        known = self.code(*names)
+        names += [f"bit{k}" for k in range(63) if (code & ~known) >> k & 1]
+        return names
+
+    def vote_day(self, *names) -> pd.Timestamp:
+        """
+        Voting day (UTC midnight, as the post times) of the given topics, or of
+        all topics with a vote_date; they must share one date.
+        """
+        names = names or [n for n in self.names if n in self.vote_dates]
+        dates = {self.vote_dates[n] for n in names if n in self.vote_dates}
+        if len(dates) != 1:
+            raise ValueError(f"expected one vote_date for {list(names)}, got {sorted(dates)}")
+        return pd.Timestamp(dates.pop(), tz="UTC")
+
+    # ------------ VECTORIZED HELPERS ------------ #
+
+    @staticmethod
+    def _codes(codes: pd.Series) -> np.ndarray:
+        # missing labels count as "no topic"
+        return pd.to_numeric(codes, errors="coerce").fillna(0).to_numpy(dtype="int64")
+
+    def has(self, codes: pd.Series, *names, how: str = "any") -> pd.Series:
+        """
+        Mask of the posts with any / all of the given topics, or with exactly
+        these topics and no other ("only"). Without names: any topic at all.
+        """
+        if how not in HOW:
+            raise ValueError(f"unknown how {how!r}, expected one of {HOW}")
+        values = self._codes(codes)
+        wanted = self.code(*names) if names else sum(self.bits.values())
+        if how == "any":
+            mask = (values & wanted) != 0
+        elif how == "all":
+            mask = (values & wanted) == wanted
+        else:
+            mask = values == wanted
+        return pd.Series(mask, index=codes.index)
+
+    def matrix(self, codes: pd.Series) -> pd.DataFrame:
+        """Compact boolean matrix: one column per topic."""
+        values = self._codes(codes)
+        return pd.DataFrame({n: (values & self.bits[n]) != 0 for n in self.names}, index=codes.index)
+
+    def counts(self, codes: pd.Series, by=None):
+        """Posts per topic (a post with two topics counts for both), optionally per group."""
+        matrix = self.matrix(codes)
+        if by is None:
+            return matrix.sum()
+        return matrix.groupby(by, observed=True).sum()
+
+    def combination_name(self, code: int) -> str:
+        names = self.decode(code)
+        if not names:
+            return "none"
+        return f"{names[0]}_only" if len(names) == 1 else "+".join(names)
+
+    def code_label(self, code: int) -> str:
+        """Legend text of a code, e.g. '3: E-ID & Eigenmietwert'."""
+        names = self.decode(code)
+        text = " & ".join(self.labels.get(n, n) for n in names) if names else self.none_label
+        return f"{int(code)}: {text}"
+
+    def combination(self, codes: pd.Series) -> pd.Series:
+        """
+        Categorical topic combination per post: 'none', '<topic>_only' or
+        'topic_a+topic_b', ordered by code. Names are built once per distinct code.
+        """
+        values = self._codes(codes)
+        distinct = np.unique(values)
+        names = {code: self.combination_name(code) for code in distinct}
+        categories = [names[code] for code in distinct]
+        return pd.Series(
+            pd.Categorical.from_codes(np.searchsorted(distinct, values), categories=categories),
+            index=codes.index,
+        )
+
+    def crosstab(self, codes: pd.Series, by) -> pd.DataFrame:
+        """Posts per group (rows) and topic combination (columns)."""
+        return pd.crosstab(by, self.combination(codes).rename("topics"))
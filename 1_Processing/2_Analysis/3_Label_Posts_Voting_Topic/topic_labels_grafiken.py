@@ -1,16 +1,23 @@
 import pandas as pd
 import os
+import sys
 import glob
 import matplotlib.pyplot as plt
+from pathlib import Path
 from typing import Dict, Any
 
+# topics and bits of the labels (topics.json, next to this script)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from topic_labels import TopicSet  # noqa: E402
+
 # --- Universal Configuration ---
 
 # Define the ABSOLUTE target output directory for charts and aggregated CSVs
 OUTPUT_DIR = '1_Processing/2_Analysis/3_Label_Posts_Voting_Topic'
 
-# Define the column containing the labels (0, 1, 2, 3)
-LABEL_COLUMN = 'voting.topic'
+# Define the column containing the labels (bitsets of the topics in topics.json)
+TOPICS = TopicSet.load()
+LABEL_COLUMN = TOPICS.column
 # The column we will create to store the party name extracted from the filename
 PARTY_COLUMN = 'party_name'
 
@@ -24,13 +31,8 @@ PLATFORM_CONFIGS: Dict[str, Dict[str, Any]] = {
     }
 }
 
-# Define mapping for topic labels for better readability in the legend
-TOPIC_MAPPING = {
-    0: '0: Not a voting topic',
-    1: '1: E-ID',
-    2: '2: Eigenmietwert',
-    3: '3: Both (E-ID & Eigenmietwert)'
-}
+# Legend text of a label code, e.g. 3 -> '3: E-ID & Eigenmietwert'
+TOPIC_MAPPING = TOPICS.code_label
 
 # --- Unified Processing Function ---
 
@@ -87,7 +89,7 @@ def aggregate_and_plot_data(platform_name: str, directory: str, output_dir: str)
         .unstack(fill_value=0)
     )
 
-    available_topics = [t for t in [0, 1, 2, 3] if t in aggregated_counts.columns]
+    available_topics = sorted(aggregated_counts.columns)
     plot_data = aggregated_counts[available_topics].rename(columns=TOPIC_MAPPING)
     
     # Save aggregated data to CSV in the specified output directory
@@ -0,0 +1,125 @@
+from collections import deque
+
+import pandas as pd
+
+
+# Multi-keyword topic matcher (Aho-Corasick).
+# All keywords of all topics are compiled into one automaton, so a caption
+# is scanned once, character by character, whatever the number of topics and
+# keywords; the cost grows with the caption length only. Every match reports
+# the topic of its keyword, and the scan stops early once every topic was
+# seen.
+#
+# Keywords are lowercase strings (matched anywhere, like `kw in text.lower()`)
+# or (keyword, rule) pairs with rule:
+#   "substring"  anywhere in the text (default)
+#   "word"       whole word only: "eid" matches "#eid" but not "Entscheid"
+#   "prefix"     at the start of a word: "mietwert" matches "Mietwerte"
+#   "suffix"     at the end of a word
+
+RULES = ("substring", "word", "prefix", "suffix")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class TopicMatcher:
+    """
+    One automaton for {topic: [keyword or (keyword, rule), ...]}.
+
+        matcher = TopicMatcher({1: ["e-id", ("eid", "word")], 2: ["eigenmietwert"]})
+        matcher.topics("Ja zur E-ID!")   # {1}
+    """
+
+    def __init__(self, topic_keywords: dict, default_rule: str = "substring"):
+        if default_rule not in RULES:
+            raise ValueError(f"unknown rule {default_rule!r}, expected one of {RULES}")
+        self.topic_keywords = topic_keywords
+        self.all_topics = frozenset(topic_keywords)
+        # trie: per node a dict char -> node, the failure link and the outputs
+        self._goto = [{}]
+        self._fail = [0]
+        # outputs per node: (keyword length, topic, rule)
+        self._out = [[]]
+
+        for topic, keywords in topic_keywords.items():
+            for keyword in keywords:
+                keyword, rule = (keyword, default_rule) if isinstance(keyword, str) else keyword
+                if rule not in RULES:
+                    raise ValueError(f"unknown rule {rule!r} for keyword {keyword!r}")
+                self._add(keyword.lower(), topic, rule)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, topic, rule: str):
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node].append((len(keyword), topic, rule))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # a node also reports everything its failure node reports
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @staticmethod
+    def _rule_ok(text: str, start: int, end: int, rule: str) -> bool:
+        if rule == "substring":
+            return True
+        left = start == 0 or not _is_word_char(text[start - 1])
+        right = end == len(text) or not _is_word_char(text[end])
+        if rule == "word":
+            return left and right
+        if rule == "prefix":
+            return left
+        return right
+
+    def topics(self, text) -> set:
+        """Set of topics with at least one keyword in text (missing text: empty set)."""
+        found = set()
+        if text is None or (not isinstance(text, str) and pd.isna(text)):
+            return found
+        text = str(text).lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, topic, rule in out[node]:
+                if topic not in found and self._rule_ok(text, i + 1 - length, i + 1, rule):
+                    found.add(topic)
+                    if len(found) == len(self.all_topics):
+                        return found
+        return found
+
+    def matches(self, text) -> list:
+        """Every (start, end, topic) keyword hit in text, for inspecting the dictionaries."""
+        hits = []
+        if text is None or (not isinstance(text, str) and pd.isna(text)):
+            return hits
+        text = str(text).lower()
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, topic, rule in self._out[node]:
+                if self._rule_ok(text, i + 1 - length, i + 1, rule):
+                    hits.append((i + 1 - length, i + 1, topic))
+        return hits
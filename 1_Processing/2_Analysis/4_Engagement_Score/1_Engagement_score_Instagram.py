@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 import pandas as pd
 
 
@@ -10,6 +11,12 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 # Folder with your party-level CSVs
 INPUT_FOLDER = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN"
 
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import party_of, update_columns  # noqa: E402
+# metric / party mean, shared by both platforms (1_Processing/engagement_metrics.py)
+from engagement_metrics import metric_share  # noqa: E402
+
 LIKE_COL = "data.like_count"
 COMMENT_COL = "data.comment_count"
 ENGAGEMENT_COL = "engagement_score"   # final, mean-centered
@@ -22,57 +29,43 @@ def add_engagement_score(
     like_col: str = LIKE_COL,
     comment_col: str = COMMENT_COL,
     out_col: str = ENGAGEMENT_COL,
+    group_col: str = None,
 ) -> pd.DataFrame:
     """
-    For one DataFrame (one party CSV):
+    For one DataFrame (one party CSV, or several parties with group_col
+    naming the party column; every step is then done per party):
 
     Step 1 (raw score):
         raw_i = (likes_i / avg_likes) + (comments_i / avg_comments)
 
     Step 2 (centered):
-        engagement_score_i = raw_i - mean(raw_i)   # mean 0 per CSV
+        engagement_score_i = raw_i - mean(raw_i)   # mean 0 per CSV / party
     """
 
     # ensure numeric
     df[like_col] = pd.to_numeric(df[like_col], errors="coerce")
     df[comment_col] = pd.to_numeric(df[comment_col], errors="coerce")
 
-    avg_likes = df[like_col].mean(skipna=True)
-    avg_comments = df[comment_col].mean(skipna=True)
-
-    def compute_raw_row(row):
-        likes = row[like_col]
-        comments = row[comment_col]
-
-        part_likes = 0.0
-        part_comments = 0.0
-
-        if pd.notna(likes) and pd.notna(avg_likes) and avg_likes != 0:
-            part_likes = likes / avg_likes
-
-        if pd.notna(comments) and pd.notna(avg_comments) and avg_comments != 0:
-            part_comments = comments / avg_comments
+    groups = df[group_col] if group_col else None
 
-        return part_likes + part_comments
+    # Step 1: raw engagement score, one column at a time
+    raw = metric_share(df[like_col], groups) + metric_share(df[comment_col], groups)
 
-    # Step 1: raw engagement score
-    df["_engagement_raw"] = df.apply(compute_raw_row, axis=1)
-
-    # Step 2: center to mean 0 within this CSV
-    mean_raw = df["_engagement_raw"].mean(skipna=True)
-    df[out_col] = df["_engagement_raw"] - mean_raw
-
-    # drop helper column
-    df = df.drop(columns=["_engagement_raw"])
+    # Step 2: center to mean 0 within this CSV / party
+    if groups is None:
+        df[out_col] = raw - raw.mean(skipna=True)
+    else:
+        df[out_col] = raw - raw.groupby(groups, observed=True, sort=False).transform("mean")
 
     return df
 
 
 def process_folder(input_folder: Path):
     """
-    Go through all CSVs in the folder, compute mean-centered engagement_score per CSV,
-    and overwrite the files.
+    Go through all CSVs in the folder, compute mean-centered engagement_score
+    per CSV (all parties in one pass), and overwrite the files.
     """
+    frames = {}
     for filename in os.listdir(input_folder):
         if not filename.endswith(".csv"):
             continue
@@ -87,9 +80,25 @@ def process_folder(input_folder: Path):
             print(f"  Missing {LIKE_COL} or {COMMENT_COL} in {filename}, skipping.")
             continue
 
-        df = add_engagement_score(df, LIKE_COL, COMMENT_COL, ENGAGEMENT_COL)
+        frames[filepath] = df
+
+    if not frames:
+        return
+
+    # score all parties at once, means per file
+    combined = pd.concat(
+        [df[[LIKE_COL, COMMENT_COL]].assign(_file=filepath.name) for filepath, df in frames.items()],
+        keys=list(frames),
+    )
+    scored = add_engagement_score(combined, LIKE_COL, COMMENT_COL, ENGAGEMENT_COL, group_col="_file")
+
+    for filepath, df in frames.items():
+        part = scored.loc[filepath]
+        for col in [LIKE_COL, COMMENT_COL, ENGAGEMENT_COL]:
+            df[col] = part[col].to_numpy()
 
         df.to_csv(filepath, index=False)
+        update_columns(df, "instagram", party_of(filepath), [ENGAGEMENT_COL])
         print(f"  Saved with {ENGAGEMENT_COL} (mean-centered) to {filepath}")
 
 
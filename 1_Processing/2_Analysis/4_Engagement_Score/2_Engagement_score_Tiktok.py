@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 import pandas as pd
 
 
@@ -10,6 +11,12 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 # Folder with your TikTok CSVs
 INPUT_FOLDER = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN"
 
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import party_of, update_columns  # noqa: E402
+# metric / party mean, shared by both platforms (1_Processing/engagement_metrics.py)
+from engagement_metrics import metric_share  # noqa: E402
+
 LIKE_COL = "data.stats.diggCount"       # likes
 COMMENT_COL = "data.stats.commentCount" # comments
 SHARE_COL = "data.stats.shareCount"     # shares
@@ -27,9 +34,11 @@ def add_engagement_score(
     share_col: str = SHARE_COL,
     view_col: str = VIEW_COL,
     out_col: str = ENGAGEMENT_COL,
+    group_col: str = None,
 ) -> pd.DataFrame:
     """
-    For one DataFrame (one party's TikTok CSV):
+    For one DataFrame (one party's TikTok CSV, or several parties with
+    group_col naming the party column; every step is then done per party):
 
     Step 1: raw_score_i =
         (likes_i   / avg_likes)   +
@@ -37,7 +46,7 @@ def add_engagement_score(
         (shares_i  / avg_shares)  +
         (views_i   / avg_views)
 
-    Step 2: center to mean 0 in that CSV:
+    Step 2: center to mean 0 in that CSV / party:
         engagement_score_i = raw_score_i - mean(raw_score)
     """
 
@@ -46,47 +55,27 @@ def add_engagement_score(
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    avg_likes = df[like_col].mean(skipna=True)
-    avg_comments = df[comment_col].mean(skipna=True)
-    avg_shares = df[share_col].mean(skipna=True)
-    avg_views = df[view_col].mean(skipna=True)
-
-    def safe_part(value, avg):
-        if pd.notna(value) and pd.notna(avg) and avg != 0:
-            return value / avg
-        return 0.0
-
-    # Step 1: compute raw engagement score
-    def compute_raw_row(row):
-        likes = row[like_col]
-        comments = row[comment_col]
-        shares = row[share_col]
-        views = row[view_col]
-
-        part_likes = safe_part(likes, avg_likes)
-        part_comments = safe_part(comments, avg_comments)
-        part_shares = safe_part(shares, avg_shares)
-        part_views = safe_part(views, avg_views)
-
-        return part_likes + part_comments + part_shares + part_views
+    groups = df[group_col] if group_col else None
 
-    df["_engagement_raw"] = df.apply(compute_raw_row, axis=1)
+    # Step 1: raw engagement score, one column at a time
+    raw = sum(metric_share(df[col], groups) for col in [like_col, comment_col, share_col, view_col])
 
-    # Step 2: center to mean 0 within this CSV
-    mean_raw = df["_engagement_raw"].mean(skipna=True)
-    df[out_col] = df["_engagement_raw"] - mean_raw
-
-    # optionally drop helper column
-    df = df.drop(columns=["_engagement_raw"])
+    # Step 2: center to mean 0 within this CSV / party
+    if groups is None:
+        df[out_col] = raw - raw.mean(skipna=True)
+    else:
+        df[out_col] = raw - raw.groupby(groups, observed=True, sort=False).transform("mean")
 
     return df
 
 
 def process_folder(input_folder: Path):
     """
-    Go through all TikTok CSVs in the folder, compute centered engagement_score per CSV,
-    and overwrite the files.
+    Go through all TikTok CSVs in the folder, compute centered engagement_score
+    per CSV (all parties in one pass), and overwrite the files.
     """
+    needed = [LIKE_COL, COMMENT_COL, SHARE_COL, VIEW_COL]
+    frames = {}
     for filename in os.listdir(input_folder):
         if not filename.endswith(".csv"):
             continue
@@ -96,14 +85,29 @@ def process_folder(input_folder: Path):
 
         df = pd.read_csv(filepath)
 
-        needed = [LIKE_COL, COMMENT_COL, SHARE_COL, VIEW_COL]
         if not all(col in df.columns for col in needed):
             print(f"  Missing one of {needed} in {filename}, skipping.")
             continue
 
-        df = add_engagement_score(df)
+        frames[filepath] = df
+
+    if not frames:
+        return
+
+    # score all parties at once, means per file
+    combined = pd.concat(
+        [df[needed].assign(_file=filepath.name) for filepath, df in frames.items()],
+        keys=list(frames),
+    )
+    scored = add_engagement_score(combined, group_col="_file")
+
+    for filepath, df in frames.items():
+        part = scored.loc[filepath]
+        for col in [*needed, ENGAGEMENT_COL]:
+            df[col] = part[col].to_numpy()
 
         df.to_csv(filepath, index=False)
+        update_columns(df, "tiktok", party_of(filepath), [ENGAGEMENT_COL])
         print(f"  Saved with {ENGAGEMENT_COL} (mean-centered) to {filepath}")
 
 
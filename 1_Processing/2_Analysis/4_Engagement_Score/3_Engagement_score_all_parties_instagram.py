@@ -1,12 +1,15 @@
 from pathlib import Path
-import os
+import sys
 import pandas as pd
 
 
 # ------------ CONFIG ------------ #
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
-INPUT_FOLDER = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN"
+
+# cached per-party summary of the clean store (1_Processing/engagement_summary.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from engagement_summary import party_table  # noqa: E402
 
 LIKE_COL = "data.like_count"
 COMMENT_COL = "data.comment_count"
@@ -33,9 +36,10 @@ def infer_party_from_filename(filename: str) -> str:
 
 # ------------ CORE LOGIC ------------ #
 
-def build_instagram_party_engagement_summary(input_folder: Path) -> pd.DataFrame:
+def build_instagram_party_engagement_summary() -> pd.DataFrame:
     """
-    For each party (CSV file), compute:
+    For each party, take from the cached store summary (one scan, see
+    engagement_summary.py):
       - total likes
       - total comments
       - number of posts
@@ -44,40 +48,23 @@ def build_instagram_party_engagement_summary(input_folder: Path) -> pd.DataFrame
     mean-center them so the average party has index 0.
     """
 
-    rows = []
-
-    for filename in os.listdir(input_folder):
-        if not filename.endswith(".csv"):
-            continue
-
-        filepath = input_folder / filename
-        party = infer_party_from_filename(filename)
-        print(f"Processing {filepath} for party {party} ...")
-
-        df = pd.read_csv(filepath)
+    totals = party_table("instagram", "total")
+    n_posts = party_table("instagram", "n_posts")
 
-        if LIKE_COL not in df.columns or COMMENT_COL not in df.columns:
-            print(f"  Missing {LIKE_COL} or {COMMENT_COL} in {filename}, skipping.")
-            continue
+    if LIKE_COL not in totals.columns or COMMENT_COL not in totals.columns:
+        print(f"Missing {LIKE_COL} or {COMMENT_COL} in the clean data, summary is empty.")
+        return pd.DataFrame()
 
-        # ensure numeric
-        df[LIKE_COL] = pd.to_numeric(df[LIKE_COL], errors="coerce")
-        df[COMMENT_COL] = pd.to_numeric(df[COMMENT_COL], errors="coerce")
-
-        total_likes = df[LIKE_COL].sum(skipna=True)
-        total_comments = df[COMMENT_COL].sum(skipna=True)
-        n_posts = len(df)
-
-        rows.append(
-            {
-                "party": party,
-                "total_likes": total_likes,
-                "total_comments": total_comments,
-                "n_posts": n_posts,
-            }
-        )
-
-    summary = pd.DataFrame(rows)
+    summary = pd.DataFrame(
+        {
+            "party": [infer_party_from_filename(f"{party}.csv") for party in totals.index],
+            "total_likes": totals[LIKE_COL].to_numpy(),
+            "total_comments": totals[COMMENT_COL].to_numpy(),
+            "n_posts": n_posts[LIKE_COL].to_numpy(),
+        }
+    )
+    totals_cols = ["total_likes", "total_comments"]
+    summary[totals_cols] = summary[totals_cols].fillna(0).round().astype("int64")
 
     if summary.empty:
         print("No valid CSVs found, summary is empty.")
@@ -112,6 +99,6 @@ def build_instagram_party_engagement_summary(input_folder: Path) -> pd.DataFrame
 
 
 if __name__ == "__main__":
-    summary_df = build_instagram_party_engagement_summary(INPUT_FOLDER)
+    summary_df = build_instagram_party_engagement_summary()
     # e.g. sort by centered engagement index
     print(summary_df.sort_values("engagement_index_centered", ascending=False))
@@ -1,12 +1,15 @@
 from pathlib import Path
-import os
+import sys
 import pandas as pd
 
 
 # ------------ CONFIG ------------ #
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
-INPUT_FOLDER = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN"
+
+# cached per-party summary of the clean store (1_Processing/engagement_summary.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from engagement_summary import party_table  # noqa: E402
 
 LIKE_COL = "data.stats.diggCount"       # likes
 COMMENT_COL = "data.stats.commentCount" # comments
@@ -35,9 +38,10 @@ def infer_party_from_filename(filename: str) -> str:
 
 # ------------ CORE LOGIC ------------ #
 
-def build_tiktok_party_engagement_summary(input_folder: Path) -> pd.DataFrame:
+def build_tiktok_party_engagement_summary() -> pd.DataFrame:
     """
-    For each party (CSV file), compute:
+    For each party, take from the cached store summary (one scan, see
+    engagement_summary.py):
       - total likes
       - total comments
       - total shares
@@ -48,45 +52,26 @@ def build_tiktok_party_engagement_summary(input_folder: Path) -> pd.DataFrame:
     mean-center them so the average party has index 0.
     """
 
-    rows = []
-
-    for filename in os.listdir(input_folder):
-        if not filename.endswith(".csv"):
-            continue
-
-        filepath = input_folder / filename
-        party = infer_party_from_filename(filename)
-        print(f"Processing {filepath} for party {party} ...")
-
-        df = pd.read_csv(filepath)
-
-        needed = [LIKE_COL, COMMENT_COL, SHARE_COL, VIEW_COL]
-        if not all(col in df.columns for col in needed):
-            print(f"  Missing one of {needed} in {filename}, skipping.")
-            continue
-
-        # ensure numeric
-        for col in needed:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-        total_likes = df[LIKE_COL].sum(skipna=True)
-        total_comments = df[COMMENT_COL].sum(skipna=True)
-        total_shares = df[SHARE_COL].sum(skipna=True)
-        total_views = df[VIEW_COL].sum(skipna=True)
-        n_posts = len(df)
-
-        rows.append(
-            {
-                "party": party,
-                "total_likes": total_likes,
-                "total_comments": total_comments,
-                "total_shares": total_shares,
-                "total_views": total_views,
-                "n_posts": n_posts,
-            }
-        )
-
-    summary = pd.DataFrame(rows)
+    totals = party_table("tiktok", "total")
+    n_posts = party_table("tiktok", "n_posts")
+
+    needed = [LIKE_COL, COMMENT_COL, SHARE_COL, VIEW_COL]
+    if not all(col in totals.columns for col in needed):
+        print(f"Missing one of {needed} in the clean data, summary is empty.")
+        return pd.DataFrame()
+
+    summary = pd.DataFrame(
+        {
+            "party": [infer_party_from_filename(f"{party}.csv") for party in totals.index],
+            "total_likes": totals[LIKE_COL].to_numpy(),
+            "total_comments": totals[COMMENT_COL].to_numpy(),
+            "total_shares": totals[SHARE_COL].to_numpy(),
+            "total_views": totals[VIEW_COL].to_numpy(),
+            "n_posts": n_posts[LIKE_COL].to_numpy(),
+        }
+    )
+    totals_cols = ["total_likes", "total_comments", "total_shares", "total_views"]
+    summary[totals_cols] = summary[totals_cols].fillna(0).round().astype("int64")
 
     if summary.empty:
         print("No valid CSVs found, summary is empty.")
@@ -134,6 +119,6 @@ def build_tiktok_party_engagement_summary(input_folder: Path) -> pd.DataFrame:
 
 
 if __name__ == "__main__":
-    summary_df = build_tiktok_party_engagement_summary(INPUT_FOLDER)
+    summary_df = build_tiktok_party_engagement_summary()
     # e.g. sort by centered engagement index
     print(summary_df.sort_values("engagement_index_centered", ascending=False))
@@ -1,6 +1,5 @@
 import pandas as pd
-import glob
-import os
+import sys
 from pathlib import Path
 import numpy as np
 from scipy.stats import spearmanr
@@ -10,31 +9,24 @@ import statsmodels.formula.api as smf
 # ---------------- CONFIG ----------------
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
-INSTAGRAM_FOLDER = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN"
-TIKTOK_FOLDER = PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN"
+COLUMNS = ["engagement_score", "voting.topic", "data.createTime"]
 
-VOTING_DAY = pd.Timestamp("2025-09-28")
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from post_table import load_posts, print_memory  # noqa: E402
+# voting day of the topics (3_Label_Posts_Voting_Topic/topics.json)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing" / "2_Analysis" / "3_Label_Posts_Voting_Topic"))
+from topic_labels import TopicSet  # noqa: E402
 
+VOTING_DAY = TopicSet.load().vote_day()  # UTC, as the post times
 
-# ---------------- LOAD DATA ----------------
-
-def load_platform(path):
-    files = glob.glob(os.path.join(path, "*.csv"))
-    dfs = []
-    for f in files:
-        df = pd.read_csv(f)
-        df["party_file"] = os.path.basename(f)
-        dfs.append(df)
-    return pd.concat(dfs, ignore_index=True)
 
-tiktok = load_platform(TIKTOK_FOLDER)
-instagram = load_platform(INSTAGRAM_FOLDER)
-
-tiktok["platform"] = "tiktok"
-instagram["platform"] = "instagram"
+# ---------------- LOAD DATA ----------------
 
-df = pd.concat([tiktok, instagram], ignore_index=True)
+# compact typed posts of both platforms, with party, party_file and platform
+df = load_posts(["tiktok", "instagram"], columns=COLUMNS)
+print_memory(df)
 df = df.dropna(subset=["engagement_score", "voting.topic", "data.createTime"])
+df["engagement_score"] = df["engagement_score"].astype("float64")  # float32-rounded in the post table; upcast only for the statistics routines
 
 
 # ---------------- TIME TO VOTE ----------------
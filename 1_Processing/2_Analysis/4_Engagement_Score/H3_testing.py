@@ -1,4 +1,5 @@
 from pathlib import Path
+import sys
 import pandas as pd
 import statsmodels.api as sm
 import matplotlib.pyplot as plt
@@ -6,7 +7,14 @@ from statsmodels.iolib.summary2 import summary_col
 
 # -------- CONFIG -------- #
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
-INPUT_FOLDER = PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN" #change per platform. For Tiktok: 1_Tiktok
+PLATFORM = "instagram"  # change per platform: "tiktok"
+
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import PLATFORMS  # noqa: E402
+from post_table import PARTY_FILE_COLUMN, load_posts, print_memory  # noqa: E402
+
+# results are written next to the clean CSVs
+INPUT_FOLDER = PLATFORMS[PLATFORM]["clean_dir"]
 
 SENTIMENT_COL = "sentiment_rulebased"
 Y_COL = "engagement_score"
@@ -15,8 +23,8 @@ Y_COL = "engagement_score"
 # -------- PARTY REGRESSION -------- #
 def run_party_regression(df: pd.DataFrame, x_col: str, y_col: str):
     d = df[[x_col, y_col]].copy()
-    d[x_col] = pd.to_numeric(d[x_col], errors="coerce")
-    d[y_col] = pd.to_numeric(d[y_col], errors="coerce")
+    d[x_col] = pd.to_numeric(d[x_col], errors="coerce").astype("float64")
+    d[y_col] = pd.to_numeric(d[y_col], errors="coerce").astype("float64")
     d = d.dropna()
 
     if len(d) < 10:
@@ -38,28 +46,34 @@ def run_party_regression(df: pd.DataFrame, x_col: str, y_col: str):
     }, d
 
 
+# -------- LOAD POSTS -------- #
+def load_party_posts(platform: str) -> pd.DataFrame:
+    # compact typed posts of one platform, one party_file per party
+    posts = load_posts([platform], columns=[SENTIMENT_COL, Y_COL])
+    print_memory(posts)
+    return posts
+
+
 # -------- RUN FOLDER -------- #
-def run_folder(input_folder: Path) -> pd.DataFrame:
+def run_folder(posts: pd.DataFrame) -> pd.DataFrame:
     rows = []
     pooled_rows = []
 
-    for csv_path in sorted(input_folder.glob("*.csv")):
-        df = pd.read_csv(csv_path)
-
+    for party_file, df in posts.groupby(PARTY_FILE_COLUMN, observed=True, sort=True):
         if SENTIMENT_COL not in df.columns or Y_COL not in df.columns:
-            rows.append({"party_file": csv_path.name, "status": "missing_columns"})
+            rows.append({"party_file": party_file, "status": "missing_columns"})
             continue
 
         res, cleaned = run_party_regression(df, SENTIMENT_COL, Y_COL)
 
         if res is None:
-            rows.append({"party_file": csv_path.name, "status": "too_few_rows"})
+            rows.append({"party_file": party_file, "status": "too_few_rows"})
             continue
 
-        rows.append({"party_file": csv_path.name, "status": "ok", **res})
+        rows.append({"party_file": party_file, "status": "ok", **res})
 
         # collect for pooled regression
-        cleaned["party_file"] = csv_path.name
+        cleaned["party_file"] = party_file
         pooled_rows.append(cleaned)
 
     results_df = pd.DataFrame(rows)
@@ -89,20 +103,18 @@ def run_folder(input_folder: Path) -> pd.DataFrame:
 
     return results_df
 
-def export_pooled_and_fdp_analysis(input_folder: Path):
+def export_pooled_and_fdp_analysis(posts: pd.DataFrame, input_folder: Path):
 
     pooled_data = []
     fdp_data = []
 
-    for csv_path in sorted(input_folder.glob("*.csv")):
-        df = pd.read_csv(csv_path)
-
+    for party_file, df in posts.groupby(PARTY_FILE_COLUMN, observed=True, sort=True):
         if SENTIMENT_COL not in df.columns or Y_COL not in df.columns:
             continue
 
         d = df[[SENTIMENT_COL, Y_COL]].copy()
-        d[SENTIMENT_COL] = pd.to_numeric(d[SENTIMENT_COL], errors="coerce")
-        d[Y_COL] = pd.to_numeric(d[Y_COL], errors="coerce")
+        d[SENTIMENT_COL] = pd.to_numeric(d[SENTIMENT_COL], errors="coerce").astype("float64")
+        d[Y_COL] = pd.to_numeric(d[Y_COL], errors="coerce").astype("float64")
         d = d.dropna()
 
         if len(d) < 10:
@@ -110,7 +122,7 @@ def export_pooled_and_fdp_analysis(input_folder: Path):
 
         pooled_data.append(d)
 
-        if "FDP" in csv_path.name.upper():
+        if "FDP" in party_file.upper():
             fdp_data.append(d)
 
     pooled_df = pd.concat(pooled_data, ignore_index=True)
@@ -165,11 +177,12 @@ def export_pooled_and_fdp_analysis(input_folder: Path):
 
 
 if __name__ == "__main__":
-    results_df = run_folder(INPUT_FOLDER)
+    posts = load_party_posts(PLATFORM)
+    results_df = run_folder(posts)
 
     out_path = INPUT_FOLDER / "sentiment_vs_engagement_ols_by_party_with_pooled.csv"
     results_df.to_csv(out_path, index=False)
-    export_pooled_and_fdp_analysis(INPUT_FOLDER)
+    export_pooled_and_fdp_analysis(posts, INPUT_FOLDER)
 
 
     print(results_df.to_string(index=False))
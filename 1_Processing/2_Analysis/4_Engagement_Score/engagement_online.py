@@ -0,0 +1,247 @@
+import argparse
+import bisect
+import math
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+
+# Incremental engagement scores.
+# The batch scripts need the whole party file for every new post (avg_likes,
+# mean_raw). Here every party keeps running statistics per metric (count,
+# mean and sum of squared deviations, updated Welford-style, plus a sorted
+# list of values for the median/IQR), so adding or replacing a post is O(1)
+# for the mean/variance. Keeping the list sorted costs an O(log n) search
+# plus an O(n) shift of the list per post (one memmove, cheap at the size of
+# a party's posts), instead of re-reading the party file. Scores are not
+# rewritten when the statistics move: each post remembers the party version
+# its score was computed at and is rebased on read. Posts are keyed by
+# (party, post id): a post several parties publish (a collab) counts for
+# each of them, as in the batch scripts.
+#
+# Methods (summed over the metrics, missing values count as 0):
+#   mean   : x / mean(x), centered to mean 0 per party (= the batch engagement_score)
+#   zscore : (x - mean(x)) / std(x)                    (population std)
+#   robust : (x - median(x)) / IQR(x)
+
+
+# ------------ CONFIG ------------ #
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+# shared typed clean-data store (1_Processing/clean_store.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from clean_store import ID_COLUMN, PARTY_COLUMN, read_clean  # noqa: E402
+
+# same metrics as 1_Engagement_score_Instagram.py / 2_Engagement_score_Tiktok.py
+METRICS = {
+    "tiktok": ["data.stats.diggCount", "data.stats.commentCount", "data.stats.shareCount", "data.stats.playCount"],
+    "instagram": ["data.like_count", "data.comment_count"],
+}
+
+METHODS = ["mean", "zscore", "robust"]
+
+
+# ------------ RUNNING STATISTICS ------------ #
+
+class RunningStats:
+    """Welford running mean/variance of one metric, with removal (the sorted values cost O(n) per change)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sorted_values = []
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        bisect.insort(self.sorted_values, x)
+
+    def remove(self, x: float):
+        if self.count <= 1:
+            self.__init__()
+            return
+        delta = x - self.mean
+        self.mean -= delta / (self.count - 1)
+        self.m2 -= delta * (x - self.mean)
+        self.count -= 1
+        del self.sorted_values[bisect.bisect_left(self.sorted_values, x)]
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.m2, 0.0) / self.count) if self.count else math.nan
+
+    def quantile(self, q: float) -> float:
+        """Linear-interpolated quantile (like pandas' default)."""
+        values = self.sorted_values
+        if not values:
+            return math.nan
+        pos = q * (len(values) - 1)
+        lo = math.floor(pos)
+        hi = min(lo + 1, len(values) - 1)
+        return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+class PartyStats:
+    """Running statistics of all metrics of one party."""
+
+    def __init__(self, metrics: list):
+        self.metrics = metrics
+        self.n_posts = 0
+        self.stats = {m: RunningStats() for m in metrics}
+        self.version = 0
+        self._params = {}  # method -> (version, parameters)
+
+    def add(self, values: tuple, sign: int = 1):
+        self.n_posts += sign
+        for metric, x in zip(self.metrics, values):
+            if not math.isnan(x):
+                if sign > 0:
+                    self.stats[metric].add(x)
+                else:
+                    self.stats[metric].remove(x)
+        self.version += 1
+
+    def params(self, method: str) -> tuple:
+        """(per-metric (center, scale), offset) of a method at the current version."""
+        cached = self._params.get(method)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        per_metric = []
+        offset = 0.0
+        for metric in self.metrics:
+            s = self.stats[metric]
+            if method == "mean":
+                center, scale = 0.0, s.mean if s.count else math.nan
+                # the mean of x / mean(x) over all posts (missing = 0)
+                if s.count and s.mean != 0:
+                    offset += s.count / self.n_posts
+            elif method == "zscore":
+                center, scale = s.mean, s.std
+            elif method == "robust":
+                center, scale = s.quantile(0.5), s.quantile(0.75) - s.quantile(0.25)
+            else:
+                raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+            per_metric.append((center, scale))
+
+        params = (per_metric, offset)
+        self._params[method] = (self.version, params)
+        return params
+
+    def score(self, values: tuple, method: str) -> float:
+        per_metric, offset = self.params(method)
+        total = 0.0
+        for x, (center, scale) in zip(values, per_metric):
+            if not math.isnan(x) and not math.isnan(scale) and scale != 0:
+                total += (x - center) / scale
+        return total - offset
+
+
+# ------------ ENGINE ------------ #
+
+class EngagementEngine:
+    """
+    Per-party engagement scores that stay current while posts stream in.
+
+        engine = EngagementEngine(METRICS["tiktok"])
+        engine.add("3_FDP", "7532...", {"data.stats.diggCount": 28, ...})
+        engine.score("3_FDP", "7532...")         # rebased to the current stats
+        engine.scores(method="zscore")           # all posts as a DataFrame
+    """
+
+    def __init__(self, metrics: list, method: str = "mean"):
+        if method not in METHODS:
+            raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+        self.metrics = list(metrics)
+        self.method = method
+        self.parties = {}
+        # (party, post id) -> [values, {method: (party version, score)}]
+        self.posts = {}
+
+    def _values(self, values) -> tuple:
+        out = []
+        for metric in self.metrics:
+            x = values.get(metric) if hasattr(values, "get") else None
+            out.append(math.nan if x is None or pd.isna(x) else float(x))
+        return tuple(out)
+
+    def add(self, party: str, post_id, values) -> float:
+        """
+        Add a post of a party (or a newer snapshot of a post the party already
+        has, which replaces the old values) and return its score under the
+        updated statistics.
+        """
+        key = (party, str(post_id))
+        if key in self.posts:
+            self.remove(*key)
+        stats = self.parties.setdefault(party, PartyStats(self.metrics))
+        values = self._values(values)
+        stats.add(values)
+        self.posts[key] = [values, {}]
+        return self.score(*key)
+
+    def remove(self, party: str, post_id):
+        values, _ = self.posts.pop((party, str(post_id)))
+        self.parties[party].add(values, sign=-1)
+
+    def score(self, party: str, post_id, method: str = None) -> float:
+        """Score of one post of a party, recomputed only if the party's stats changed since the last read."""
+        method = method or self.method
+        values, cache = self.posts[(party, str(post_id))]
+        stats = self.parties[party]
+        cached = cache.get(method)
+        if cached is None or cached[0] != stats.version:
+            cached = (stats.version, stats.score(values, method))
+            cache[method] = cached
+        return cached[1]
+
+    def scores(self, party: str = None, method: str = None) -> pd.DataFrame:
+        """data.id, party and score of every post (of one party)."""
+        method = method or self.method
+        rows = [
+            (post_id, post_party, self.score(post_party, post_id, method))
+            for post_party, post_id in self.posts
+            if party is None or post_party == party
+        ]
+        return pd.DataFrame(rows, columns=[ID_COLUMN, PARTY_COLUMN, f"engagement_{method}"])
+
+    def summary(self) -> pd.DataFrame:
+        """Current running statistics per party and metric."""
+        rows = []
+        for party, stats in sorted(self.parties.items()):
+            for metric, s in stats.stats.items():
+                rows.append({
+                    PARTY_COLUMN: party, "metric": metric, "n_posts": stats.n_posts, "count": s.count,
+                    "mean": s.mean, "std": s.std, "median": s.quantile(0.5),
+                    "iqr": s.quantile(0.75) - s.quantile(0.25),
+                })
+        return pd.DataFrame(rows)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, metrics: list, method: str = "mean",
+                   party_col: str = PARTY_COLUMN, id_col: str = ID_COLUMN) -> "EngagementEngine":
+        """Engine fed with every row of df, in row order."""
+        engine = cls(metrics, method)
+        for record in df[[party_col, id_col, *metrics]].to_dict("records"):
+            party = record.pop(party_col)
+            engine.add(party, record.pop(id_col), record)
+        return engine
+
+
+# ------------ CLI ------------ #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream the clean posts through the online engagement engine.")
+    parser.add_argument("--platform", choices=list(METRICS), default="tiktok")
+    parser.add_argument("--method", choices=METHODS, default="mean")
+    args = parser.parse_args()
+
+    posts = read_clean(args.platform, columns=[ID_COLUMN, *METRICS[args.platform]])
+    engine = EngagementEngine.from_frame(posts, METRICS[args.platform], args.method)
+    scores = engine.scores()
+    print(scores.groupby(PARTY_COLUMN, observed=True)[f"engagement_{args.method}"].describe())
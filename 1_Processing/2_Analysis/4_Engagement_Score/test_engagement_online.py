@@ -0,0 +1,35 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# The online "mean" score equals the batch engagement_score of
+# 1_Engagement_score_Instagram.py, also when parties share post ids (collabs).
+#
+#   python -m pytest 1_Processing/2_Analysis/4_Engagement_Score/test_engagement_online.py
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+from engagement_online import METRICS, EngagementEngine  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location("engagement_instagram", HERE / "1_Engagement_score_Instagram.py")
+engagement_instagram = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(engagement_instagram)
+
+
+def test_mean_equals_batch_score_with_shared_ids():
+    posts = pd.DataFrame({
+        "party": ["A", "A", "A", "B", "B", "C"],
+        "data.id": ["1", "2", "3", "1", "4", "3"],   # 1 in A and B, 3 in A and C
+        "data.like_count": [10, 30, np.nan, 200, 40, 5],
+        "data.comment_count": [1, 0, 4, 9, 3, np.nan],
+    })
+    batch = engagement_instagram.add_engagement_score(posts.copy(), group_col="party")
+    online = EngagementEngine.from_frame(posts, METRICS["instagram"]).scores()
+
+    assert len(online) == len(posts)
+    merged = batch.merge(online, on=["party", "data.id"], validate="one_to_one")
+    np.testing.assert_allclose(merged["engagement_mean"], merged["engagement_score"], atol=1e-12)
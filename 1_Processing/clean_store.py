@@ -0,0 +1,240 @@
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+
+# Typed, columnar copy of the clean data, partitioned by platform and party:
+#
+#   A_Data/0_STORE/platform=tiktok/party=3_FDP/part.parquet
+#
+# Counts are Int64, post ids strings (no float round trip for TikTok's
+# 19-digit ids), post timestamps tz-aware UTC and the party a categorical.
+# The cleaners write a partition next to every <party>__cleaned.csv, and
+# the stages that add columns (sentiment, topic labels, engagement score)
+# push them with update_columns(). read_clean() loads only the requested
+# columns; a party whose partition is missing or lags behind its CSV, or an
+# environment without pyarrow, falls back to the clean CSV with the same
+# dtypes.
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STORE_DIR = PROJECT_ROOT / "A_Data" / "0_STORE"
+PART_FILE = "part.parquet"
+ID_COLUMN = "data.id"
+PARTY_COLUMN = "party"
+
+PLATFORMS = {
+    "tiktok": {
+        "clean_dir": PROJECT_ROOT / "A_Data" / "1_Tiktok" / "2_CLEAN",
+        "timestamp": "data.createTime",
+        "counts": [
+            "data.stats.collectCount", "data.stats.commentCount", "data.stats.diggCount",
+            "data.stats.playCount", "data.stats.shareCount",
+        ],
+        "strings": ["data.author.id"],
+    },
+    "instagram": {
+        "clean_dir": PROJECT_ROOT / "A_Data" / "2_Instagram" / "2_CLEAN",
+        "timestamp": "data.caption.created_at",
+        "counts": ["data.like_count", "data.comment_count", "data.ig_play_count"],
+        "strings": [],
+    },
+}
+
+# columns added by the analysis stages
+COLUMN_TYPES = {
+    "voting.topic": "Int64",
+}
+
+_CLEAN_SUFFIX = "__cleaned.csv"
+
+
+def party_of(clean_file) -> str:
+    """'3_FDP__cleaned.csv' -> '3_FDP'"""
+    return re.sub(f"{_CLEAN_SUFFIX}$", "", os.path.basename(str(clean_file))).rstrip("_")
+
+
+def partition_path(platform: str, party: str) -> Path:
+    return STORE_DIR / f"platform={platform}" / f"party={party}" / PART_FILE
+
+
+def clean_csv_path(platform: str, party: str) -> Path:
+    return PLATFORMS[platform]["clean_dir"] / f"{party}{_CLEAN_SUFFIX}"
+
+
+def parties(platform: str) -> list:
+    """Parties of a platform: every clean CSV and every store partition."""
+    found = {party_of(p) for p in PLATFORMS[platform]["clean_dir"].glob(f"*{_CLEAN_SUFFIX}")}
+    found.update(p.parent.name.split("=", 1)[1] for p in (STORE_DIR / f"platform={platform}").glob(f"party=*/{PART_FILE}"))
+    return sorted(found)
+
+
+def source_signature(platform: str) -> dict:
+    """size + mtime of every clean CSV and partition of a platform (cache key for derived tables)."""
+    signature = {}
+    for party in parties(platform):
+        paths = [clean_csv_path(platform, party)] + ([partition_path(platform, party)] if HAVE_PARQUET else [])
+        for path in paths:
+            if path.exists():
+                stat = path.stat()
+                signature[str(path.relative_to(STORE_DIR.parent))] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def typed_frame(df: pd.DataFrame, platform: str, party: str = None) -> pd.DataFrame:
+    """Store dtypes for the columns of df that have one (in place and returned)."""
+    config = PLATFORMS[platform]
+    if ID_COLUMN in df.columns:
+        df[ID_COLUMN] = df[ID_COLUMN].astype("string")
+    for col in config["strings"]:
+        if col in df.columns:
+            df[col] = df[col].astype("string")
+    for col in config["counts"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+    for col, dtype in COLUMN_TYPES.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    ts = config["timestamp"]
+    if ts in df.columns and not isinstance(df[ts].dtype, pd.DatetimeTZDtype):
+        # naive timestamps (TikTok createTime) are UTC already
+        df[ts] = pd.to_datetime(df[ts], utc=True, errors="coerce", format="mixed")
+    if party is not None:
+        df[PARTY_COLUMN] = pd.Categorical([party] * len(df))
+    return df
+
+
+def _csv_dtypes(platform: str) -> dict:
+    return {ID_COLUMN: str, **{col: str for col in PLATFORMS[platform]["strings"]}}
+
+
+def write_partition(df: pd.DataFrame, platform: str, party: str) -> Path:
+    """Replace the partition of one party with df (typed first)."""
+    if not HAVE_PARQUET:
+        return None
+    path = partition_path(platform, party)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = typed_frame(df.copy(), platform, party)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def read_partition(platform: str, party: str, columns=None) -> pd.DataFrame:
+    return pd.read_parquet(partition_path(platform, party), columns=columns)
+
+
+def append_partition(df: pd.DataFrame, platform: str, party: str) -> Path:
+    """Append rows to a party's partition (created from the clean CSV if missing)."""
+    if not HAVE_PARQUET:
+        return None
+    path = partition_path(platform, party)
+    if path.exists():
+        existing = read_partition(platform, party)
+    else:
+        csv_path = clean_csv_path(platform, party)
+        existing = pd.read_csv(csv_path, dtype=_csv_dtypes(platform)) if csv_path.exists() else pd.DataFrame()
+        # the CSV already holds the appended rows
+        if not existing.empty:
+            return write_partition(existing, platform, party)
+    df = typed_frame(df.copy(), platform, party)
+    return write_partition(pd.concat([existing, df], ignore_index=True), platform, party)
+
+
+def update_columns(df: pd.DataFrame, platform: str, party: str, columns) -> Path:
+    """
+    Set derived columns (e.g. sentiment_rulebased) of a party's partition
+    from df, matched on data.id. Without a partition the whole df is written.
+    """
+    if not HAVE_PARQUET:
+        return None
+    columns = [c for c in columns if c in df.columns]
+    path = partition_path(platform, party)
+    if not path.exists() or ID_COLUMN not in df.columns:
+        return write_partition(df, platform, party)
+
+    part = read_partition(platform, party)
+    values = df[[ID_COLUMN, *columns]].copy()
+    values[ID_COLUMN] = values[ID_COLUMN].astype("string")
+    values = values.drop_duplicates(ID_COLUMN, keep="last").set_index(ID_COLUMN)
+    for col in columns:
+        part[col] = part[ID_COLUMN].map(values[col]).to_numpy()
+    return write_partition(part, platform, party)
+
+
+def _csv_columns(csv_path: Path) -> list:
+    return pd.read_csv(csv_path, nrows=0).columns.tolist() if csv_path.exists() else []
+
+
+def read_party(platform: str, party: str, columns=None) -> pd.DataFrame:
+    """
+    One party's posts (requested columns only). Read from the store unless
+    the clean CSV has a requested column the partition does not have yet;
+    None if the party has neither.
+    """
+    csv_path = clean_csv_path(platform, party)
+    path = partition_path(platform, party)
+    if HAVE_PARQUET and path.exists():
+        import pyarrow.parquet as pq
+        stored = pq.read_schema(path).names
+        if columns is None:
+            return read_partition(platform, party)
+        missing = [c for c in columns if c not in stored]
+        if not set(missing) & set(_csv_columns(csv_path)):
+            return read_partition(platform, party, [c for c in columns if c in stored])
+
+    if not csv_path.exists():
+        return None
+    usecols = None if columns is None else (lambda c: c in columns)
+    df = typed_frame(pd.read_csv(csv_path, usecols=usecols, dtype=_csv_dtypes(platform)), platform)
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+def read_clean(platform: str, columns=None, party_list=None) -> pd.DataFrame:
+    """
+    Posts of one platform with a categorical party column. columns limits
+    what is read (party is always added); columns a party does not have
+    are left out, like pd.read_csv(usecols=callable) does.
+    """
+    frames = []
+    for party in party_list or parties(platform):
+        df = read_party(platform, party, columns)
+        if df is None:
+            continue
+        df[PARTY_COLUMN] = party
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=[*(columns or []), PARTY_COLUMN])
+    out = pd.concat(frames, ignore_index=True)
+    out[PARTY_COLUMN] = out[PARTY_COLUMN].astype(pd.CategoricalDtype(sorted(set(out[PARTY_COLUMN]))))
+    return out
+
+
+def sync_party(platform: str, party: str) -> Path:
+    """Rebuild one party's partition from its clean CSV (after rows were rewritten)."""
+    csv_path = clean_csv_path(platform, party)
+    if not csv_path.exists():
+        return None
+    return write_partition(pd.read_csv(csv_path, dtype=_csv_dtypes(platform)), platform, party)
+
+
+def sync_from_csv(platform: str) -> list:
+    """Rebuild every partition of a platform from its clean CSVs."""
+    return [path for path in (sync_party(platform, party) for party in parties(platform)) if path is not None]
+
+
+if __name__ == "__main__":
+    if not HAVE_PARQUET:
+        raise SystemExit("pyarrow is not installed: pip install pyarrow")
+    for name in PLATFORMS:
+        paths = sync_from_csv(name)
+        print(f"{name}: {len(paths)} partitions written to {STORE_DIR / f'platform={name}'}")
@@ -0,0 +1,21 @@
+import pandas as pd
+
+
+# Helpers shared by the engagement score scripts
+# (2_Analysis/4_Engagement_Score/1_Engagement_score_Instagram.py and
+# 2_Engagement_score_Tiktok.py): every metric enters the score as its share
+# of the party mean.
+
+
+def metric_share(values: pd.Series, groups: pd.Series = None) -> pd.Series:
+    """
+    values / mean(values), per group if groups is given. Missing values and
+    groups whose mean is missing or 0 give 0.
+    """
+    values = pd.to_numeric(values, errors="coerce").astype("float64")
+    if groups is None:
+        avg = pd.Series(values.mean(skipna=True), index=values.index)
+    else:
+        avg = values.groupby(groups, observed=True, sort=False).transform("mean")
+    valid = values.notna() & avg.notna() & (avg != 0)
+    return (values / avg).where(valid, 0.0)
@@ -0,0 +1,109 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from clean_store import ID_COLUMN, PARTY_COLUMN, PLATFORMS, STORE_DIR, read_clean, source_signature
+
+
+# Per-party and per-platform engagement summary from one scan of the store.
+# The counts (plus engagement_score and sentiment_rulebased where present) of
+# every post of a platform are read once from the clean store, stacked into
+# (party, metric, value) and aggregated in one groupby: posts, totals,
+# means, medians, std, min/max and quantiles, plus the platform-wide rows
+# (party "ALL"). Per party it also keeps the posts with a data.id (n_ids)
+# and the date range of the posts. The result is a small table cached next
+# to the store (A_Data/0_STORE/summary_<platform>.csv) and rebuilt only when
+# a clean CSV or partition changed since (size + mtime of every source).
+#
+#   python engagement_summary.py            # rebuild and print both platforms
+
+ALL_PARTIES = "ALL"
+DERIVED_METRICS = ["engagement_score", "sentiment_rulebased"]
+QUANTILES = [0.1, 0.25, 0.75, 0.9]
+STAT_COLUMNS = ["n_posts", "count", "total", "mean", "median", "std", "min", "max"] + [
+    f"q{int(q * 100)}" for q in QUANTILES
+]
+PARTY_COLUMNS = ["n_ids", "first_post", "last_post"]
+
+
+def summary_path(platform: str) -> Path:
+    return STORE_DIR / f"summary_{platform}.csv"
+
+
+def metrics(platform: str) -> list:
+    return PLATFORMS[platform]["counts"] + DERIVED_METRICS
+
+
+def build_summary(platform: str) -> pd.DataFrame:
+    """Long table: one row per (party, metric) and per metric for ALL parties."""
+    ts = PLATFORMS[platform]["timestamp"]
+    posts = read_clean(platform, columns=[ID_COLUMN, ts, *metrics(platform)])
+    if posts.empty:
+        return pd.DataFrame(columns=["platform", PARTY_COLUMN, "metric", *STAT_COLUMNS, *PARTY_COLUMNS])
+
+    present = [m for m in metrics(platform) if m in posts.columns]
+    long = posts.melt(id_vars=[PARTY_COLUMN], value_vars=present, var_name="metric")
+    long["value"] = pd.to_numeric(long["value"], errors="coerce").astype("float64")
+    # the platform-wide rows are the same aggregation over a second key
+    long = pd.concat([long, long.assign(**{PARTY_COLUMN: ALL_PARTIES})], ignore_index=True)
+    long[PARTY_COLUMN] = long[PARTY_COLUMN].astype(str)
+
+    grouped = long.groupby([PARTY_COLUMN, "metric"], sort=True)["value"]
+    summary = grouped.agg(
+        n_posts="size", count="count", total="sum", mean="mean", median="median", std="std", min="min", max="max",
+    )
+    quantiles = grouped.quantile(QUANTILES).unstack()
+    quantiles.columns = [f"q{int(q * 100)}" for q in quantiles.columns]
+    summary = summary.join(quantiles).reset_index()
+
+    # party-level attributes: posts with an id, date range of the posts
+    by_party = posts.groupby(PARTY_COLUMN, observed=True)
+    attributes = by_party[ID_COLUMN].count().rename("n_ids").to_frame()
+    attributes = attributes.join(by_party[ts].agg(first_post="min", last_post="max"))
+    attributes.index = attributes.index.astype(str)
+    attributes.loc[ALL_PARTIES] = [posts[ID_COLUMN].count(), posts[ts].min(), posts[ts].max()]
+    summary = summary.join(attributes, on=PARTY_COLUMN)
+
+    summary.insert(0, "platform", platform)
+    return summary
+
+
+def load_summary(platform: str, refresh: bool = False) -> pd.DataFrame:
+    """Cached summary of a platform; rebuilt if any source changed (or refresh)."""
+    path = summary_path(platform)
+    meta_path = path.with_suffix(".json")
+    signature = source_signature(platform)
+    if not refresh and path.exists() and meta_path.exists():
+        with open(meta_path, "r", encoding="utf-8") as f:
+            if json.load(f) == signature:
+                cached = pd.read_csv(path, parse_dates=["first_post", "last_post"])
+                # summaries written before a column was added are rebuilt
+                if set(PARTY_COLUMNS) <= set(cached.columns):
+                    return cached
+
+    summary = build_summary(platform)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(path, index=False)
+    tmp = meta_path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(signature, f, indent=1)
+    os.replace(tmp, meta_path)
+    return summary
+
+
+def party_table(platform: str, stat: str, include_all: bool = False) -> pd.DataFrame:
+    """Wide view of one statistic: one row per party, one column per metric."""
+    summary = load_summary(platform)
+    if not include_all:
+        summary = summary[summary[PARTY_COLUMN] != ALL_PARTIES]
+    return summary.pivot(index=PARTY_COLUMN, columns="metric", values=stat)
+
+
+if __name__ == "__main__":
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        for name in PLATFORMS:
+            table = load_summary(name, refresh=True)
+            print(f"--- {name}: {table[PARTY_COLUMN].nunique() - 1} parties, written to {summary_path(name)}")
+            print(table[table[PARTY_COLUMN] == ALL_PARTIES].drop(columns=["platform"]).to_string(index=False))
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from clean_store import (
+    COLUMN_TYPES, HAVE_PARQUET, ID_COLUMN, PARTY_COLUMN, PLATFORMS, STORE_DIR, read_clean, source_signature,
+)
+
+
+# Compact in-memory post table for the hypothesis scripts.
+# load_posts() stacks the clean posts of both platforms (from the store, see
+# clean_store.read_clean) into one frame with the smallest dtypes that hold
+# the data: party, platform and party_file as categoricals, counters as
+# nullable Int32 (Int64 only if a value does not fit), scores as float32,
+# the voting topic bitset in the smallest nullable int (Int8 up to 7 topics)
+# and repeated strings (source platform, author, media type, reposted
+# captions) as categoricals, i.e. every distinct value is stored once.
+# Mostly unique text (captions) stays an Arrow-backed string column when
+# pyarrow is installed.
+#
+# Loaded tables are cached per (platforms, columns) in the process and on
+# disk (A_Data/0_STORE/_cache/posts_<key>.parquet), keyed by the size and
+# mtime of every clean CSV and partition they come from: running H1-H4 back
+# to back or re-running notebook cells parses the corpus once.
+#
+#   posts = load_posts(columns=["engagement_score", "voting.topic"])
+#   print_memory(posts)
+
+PLATFORM_COLUMN = "platform"
+PARTY_FILE_COLUMN = "party_file"
+SCORE_COLUMNS = ["engagement_score", "sentiment_rulebased"]
+SMALL_INT_COLUMNS = ["voting.topic"]
+# a text column becomes categorical if at most this share of its values is distinct
+CATEGORY_MAX_UNIQUE = 0.5
+
+CACHE_DIR = STORE_DIR / "_cache"
+
+_INT32_MAX = np.iinfo(np.int32).max
+_MEMORY_CACHE = {}  # key -> (signature, frame)
+
+
+def _counter_columns() -> set:
+    return {col for config in PLATFORMS.values() for col in config["counts"]}
+
+
+def _compact_int(values: pd.Series) -> pd.Series:
+    values = pd.to_numeric(values, errors="coerce").astype("Int64")
+    fits = values.dropna().abs().max() <= _INT32_MAX if values.notna().any() else True
+    return values.astype("Int32") if fits else values
+
+
+def _compact_small_int(values: pd.Series) -> pd.Series:
+    values = pd.to_numeric(values, errors="coerce").astype("Int64")
+    top = values.dropna().abs().max() if values.notna().any() else 0
+    for dtype in ["Int8", "Int16", "Int32"]:
+        if top <= np.iinfo(dtype.lower()).max:
+            return values.astype(dtype)
+    return values
+
+
+def _compact_text(values: pd.Series) -> pd.Series:
+    present = values.dropna()
+    if len(present) and present.nunique() <= CATEGORY_MAX_UNIQUE * len(present):
+        # plain str categories, so the dtype survives the Parquet cache
+        return values.astype(object).astype("category")
+    return values.astype("string[pyarrow]" if HAVE_PARQUET else "string")
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Smallest dtypes for the known columns of df (in place and returned)."""
+    counters = _counter_columns()
+    for col in df.columns:
+        values = df[col]
+        if col in (PARTY_COLUMN, PLATFORM_COLUMN, PARTY_FILE_COLUMN):
+            df[col] = values.astype("category")
+        elif col == ID_COLUMN:
+            df[col] = values.astype("string[pyarrow]" if HAVE_PARQUET else "string")
+        elif col in counters:
+            df[col] = _compact_int(values)
+        elif col in SMALL_INT_COLUMNS:
+            df[col] = _compact_small_int(values)
+        elif col in SCORE_COLUMNS:
+            df[col] = pd.to_numeric(values, errors="coerce").astype("float32")
+        elif col in COLUMN_TYPES:
+            continue
+        elif pd.api.types.is_bool_dtype(values) or isinstance(values.dtype, pd.DatetimeTZDtype):
+            continue
+        elif values.dtype == object and values.dropna().map(type).eq(bool).all():
+            # bool column padded with NaN by the concat (column of one platform only)
+            df[col] = values.astype("boolean")
+        elif pd.api.types.is_string_dtype(values) or values.dtype == object:
+            df[col] = _compact_text(values)
+        elif pd.api.types.is_float_dtype(values):
+            df[col] = pd.to_numeric(values, downcast="float")
+    return df
+
+
+def _read_posts(platforms: list, columns) -> pd.DataFrame:
+    frames = []
+    for platform in platforms:
+        df = read_clean(platform, columns=columns)
+        df[PARTY_COLUMN] = df[PARTY_COLUMN].astype(str)
+        df[PLATFORM_COLUMN] = platform
+        frames.append(df)
+
+    posts = pd.concat(frames, ignore_index=True)
+    posts[PARTY_FILE_COLUMN] = posts[PARTY_COLUMN] + "__cleaned.csv"
+    return compact(posts)
+
+
+def cache_path(platforms: list, columns) -> Path:
+    key = hashlib.sha1(json.dumps([platforms, columns]).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"posts_{key}.parquet"
+
+
+def _read_cache(path: Path, signature: dict):
+    meta_path = path.with_suffix(".json")
+    if not (HAVE_PARQUET and path.exists() and meta_path.exists()):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        if json.load(f) != signature:
+            return None
+    return pd.read_parquet(path)
+
+
+def _write_cache(path: Path, signature: dict, posts: pd.DataFrame):
+    if not HAVE_PARQUET:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    posts.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(signature, f, indent=1)
+    os.replace(tmp, path.with_suffix(".json"))
+
+
+def load_posts(platforms=None, columns=None, cache: bool = True) -> pd.DataFrame:
+    """
+    Posts of the given platforms (default: all) as one compact frame with
+    platform, party and party_file ('3_FDP__cleaned.csv') columns. columns
+    limits what is read, like clean_store.read_clean. Served from the
+    process or disk cache while no source file changed; every call returns
+    its own copy.
+    """
+    platforms = list(platforms or PLATFORMS)
+    columns = None if columns is None else list(columns)
+    if not cache:
+        return _read_posts(platforms, columns)
+
+    signature = {platform: source_signature(platform) for platform in platforms}
+    path = cache_path(platforms, columns)
+    cached = _MEMORY_CACHE.get(path.name)
+    if cached is not None and cached[0] == signature:
+        return cached[1].copy()
+
+    posts = _read_cache(path, signature)
+    if posts is None:
+        posts = _read_posts(platforms, columns)
+        _write_cache(path, signature, posts)
+    _MEMORY_CACHE[path.name] = (signature, posts)
+    return posts.copy()
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Bytes (deep) and dtype per column, largest first, plus a total row."""
+    usage = df.memory_usage(deep=True, index=True)
+    report = pd.DataFrame({"dtype": df.dtypes.astype(str).reindex(usage.index).fillna(""), "bytes": usage})
+    report = report.sort_values("bytes", ascending=False)
+    report.loc["total"] = ["", int(usage.sum())]
+    return report
+
+
+def format_bytes(n: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def print_memory(df: pd.DataFrame, label: str = "posts"):
+    total = int(df.memory_usage(deep=True).sum())
+    per_row = total / len(df) if len(df) else 0
+    print(f"{label}: {len(df):,} rows x {df.shape[1]} columns, {format_bytes(total)} ({per_row:,.0f} B per row)")
+
+
+if __name__ == "__main__":
+    raw = pd.concat(
+        [read_clean(name).assign(**{PLATFORM_COLUMN: name}) for name in PLATFORMS], ignore_index=True
+    ).astype({PARTY_COLUMN: object})
+    print_memory(raw, "store dtypes")
+    posts = load_posts()
+    print_memory(posts, "compact")
+    print(memory_report(posts).assign(size=lambda r: r["bytes"].map(format_bytes)).to_string())
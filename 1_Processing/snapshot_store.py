@@ -0,0 +1,177 @@
+import argparse
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from clean_store import STORE_DIR
+
+
+# Engagement history of every post across repeated scrapes.
+# The clean CSVs only keep the newest snapshot of a post's counters; this
+# append-only SQLite table keeps one row per (post id, scrape time) with the
+# raw counters of that scrape. The primary key is clustered (WITHOUT ROWID),
+# so the snapshots of a post are stored together in time order and "latest
+# value as of T" / "growth between T1 and T2" are index range scans.
+# Scrape times are epoch seconds (UTC); the cleaning driver records every
+# snapshot it reads (see dedup_index.SnapshotRecorder).
+#
+#   python snapshot_store.py --platform tiktok --as-of 2025-09-28
+#   python snapshot_store.py --platform tiktok --growth 2025-10-01 2025-10-20
+
+SNAPSHOT_FILE = STORE_DIR / "engagement_snapshots.sqlite"
+
+# counter name -> (field in the raw export, dtype of the query results)
+COUNTERS = {
+    "tiktok": {
+        "collect": ("data.stats.collectCount", "Int32"),
+        "comment": ("data.stats.commentCount", "Int32"),
+        "digg": ("data.stats.diggCount", "Int32"),
+        "play": ("data.stats.playCount", "Int64"),
+        "share": ("data.stats.shareCount", "Int32"),
+    },
+    "instagram": {
+        "like": ("data.like_count", "Int32"),
+        "comment": ("data.comment_count", "Int32"),
+        "play": ("data.ig_play_count", "Int64"),
+    },
+}
+
+
+def _table(platform: str) -> str:
+    if platform not in COUNTERS:
+        raise ValueError(f"unknown platform {platform!r}")
+    return f"{platform}_snapshots"
+
+
+def to_epoch(value) -> int:
+    """Timestamp-like (str, datetime, epoch seconds) -> epoch seconds; naive times are UTC."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return int(stamp.timestamp())
+
+
+class SnapshotStore:
+    """Append-only (post id, scrape time) -> counters table per platform."""
+
+    def __init__(self, path: Path = SNAPSHOT_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # accounts are cleaned in parallel processes: wait for the write lock
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        for platform, counters in COUNTERS.items():
+            columns = ", ".join(f"{name} INTEGER" for name in counters)
+            self.conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {_table(platform)} (
+                    post_id    TEXT NOT NULL,
+                    scraped_at INTEGER NOT NULL,
+                    {columns},
+                    PRIMARY KEY (post_id, scraped_at)
+                ) WITHOUT ROWID
+                """
+            )
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_table(platform)}_time ON {_table(platform)} (scraped_at)"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def append(self, platform: str, rows) -> int:
+        """
+        Add snapshots [(post_id, scraped_at, {counter: value}), ...]. A
+        snapshot that is already stored is left as it is. Returns the number
+        of new rows.
+        """
+        names = list(COUNTERS[platform])
+        placeholders = ", ".join("?" * (len(names) + 2))
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO {_table(platform)} (post_id, scraped_at, {', '.join(names)}) "
+                f"VALUES ({placeholders})",
+                [
+                    (str(post_id), int(scraped_at), *[counters.get(name) for name in names])
+                    for post_id, scraped_at, counters in rows
+                ],
+            )
+        return self.conn.total_changes - before
+
+    def _typed(self, df: pd.DataFrame, platform: str) -> pd.DataFrame:
+        df["post_id"] = df["post_id"].astype("string")
+        for name, (_, dtype) in COUNTERS[platform].items():
+            for col in (name, f"{name}_growth"):
+                if col in df.columns:
+                    df[col] = df[col].astype("Int64" if col.endswith("_growth") else dtype)
+        for col in ("scraped_at", "scraped_at_t1", "scraped_at_t2"):
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], unit="s", utc=True)
+        return df
+
+    def history(self, platform: str, post_id) -> pd.DataFrame:
+        """All snapshots of one post, oldest first."""
+        df = pd.read_sql_query(
+            f"SELECT * FROM {_table(platform)} WHERE post_id = ? ORDER BY scraped_at",
+            self.conn, params=(str(post_id),),
+        )
+        return self._typed(df, platform)
+
+    def _as_of_sql(self, platform: str, alias: str) -> str:
+        # newest snapshot per post with scraped_at <= :t: one scan of the whole
+        # table in primary-key order (grouped by post_id without a sort), then
+        # one primary-key lookup per post; the cost grows with all stored snapshots
+        table = _table(platform)
+        return f"""
+            SELECT s.* FROM {table} s
+            JOIN (SELECT post_id, MAX(scraped_at) AS scraped_at FROM {table}
+                  WHERE scraped_at <= :{alias} GROUP BY post_id) last
+              ON s.post_id = last.post_id AND s.scraped_at = last.scraped_at
+        """
+
+    def latest_as_of(self, platform: str, t) -> pd.DataFrame:
+        """Newest counters of every post scraped at or before t."""
+        df = pd.read_sql_query(self._as_of_sql(platform, "t"), self.conn, params={"t": to_epoch(t)})
+        return self._typed(df, platform)
+
+    def growth(self, platform: str, t1, t2) -> pd.DataFrame:
+        """
+        Counter growth per post between the newest snapshots as of t1 and as
+        of t2 (posts with a snapshot at both times), plus the hours between
+        those two snapshots.
+        """
+        names = list(COUNTERS[platform])
+        deltas = ", ".join(f"b.{n} - a.{n} AS {n}_growth" for n in names)
+        sql = f"""
+            SELECT a.post_id, a.scraped_at AS scraped_at_t1, b.scraped_at AS scraped_at_t2,
+                   (b.scraped_at - a.scraped_at) / 3600.0 AS hours, {deltas}
+            FROM ({self._as_of_sql(platform, "t1")}) a
+            JOIN ({self._as_of_sql(platform, "t2")}) b ON a.post_id = b.post_id
+        """
+        df = pd.read_sql_query(sql, self.conn, params={"t1": to_epoch(t1), "t2": to_epoch(t2)})
+        return self._typed(df, platform)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the engagement snapshot store.")
+    parser.add_argument("--platform", choices=list(COUNTERS), required=True)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--as-of", metavar="T")
+    group.add_argument("--growth", nargs=2, metavar=("T1", "T2"))
+    args = parser.parse_args()
+
+    with SnapshotStore() as store:
+        if args.as_of:
+            result = store.latest_as_of(args.platform, args.as_of)
+        else:
+            result = store.growth(args.platform, *args.growth)
+    print(result.describe(include="all").T if not result.empty else "no snapshots in range")
@@ -6,83 +6,68 @@ AI GENERATED with claude sonnet 4.5
 """
 
 import pandas as pd
-import os
+import sys
 from pathlib import Path
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import numpy as np
 
-# Directory containing the cleaned CSV files
-DATA_DIR = "/Users/davidrothschild/Downloads/group work/Introduction-to-Computational-Media-Research/A_Data/1_Tiktok/2_CLEAN"
-OUTPUT_PDF = "/Users/davidrothschild/Downloads/group work/Introduction-to-Computational-Media-Research/A_Data/Table 1/Table1_TikTok.pdf"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+OUTPUT_PDF = PROJECT_ROOT / "A_Data" / "Table 1" / "Table1_TikTok.pdf"
+
+# cached per-party summary of the clean store (1_Processing/engagement_summary.py)
+sys.path.insert(0, str(PROJECT_ROOT / "1_Processing"))
+from engagement_summary import ALL_PARTIES, load_summary  # noqa: E402
+
+# Columns for statistics
+STAT_COLUMNS = [
+    'data.stats.collectCount',
+    'data.stats.commentCount',
+    'data.stats.diggCount',
+    'data.stats.playCount',
+    'data.stats.shareCount'
+]
 
 def load_all_data():
-    """Load all CSV files and combine them into a single DataFrame"""
-    all_data = []
-    
-    # Get all CSV files in the directory
-    csv_files = sorted(Path(DATA_DIR).glob("*_cleaned.csv"))
-    
-    for csv_file in csv_files:
-        # Extract party name from filename
-        party_name = csv_file.stem.split('__')[0]
-        
-        # Read CSV
-        df = pd.read_csv(csv_file)
-        df['party'] = party_name
-        all_data.append(df)
-    
-    # Combine all data
-    combined_df = pd.concat(all_data, ignore_index=True)
-    
-    # Convert createTime to datetime
-    combined_df['data.createTime'] = pd.to_datetime(combined_df['data.createTime'])
-    
-    return combined_df
+    """Load the per-party summary of all TikTok posts (one scan of the clean store, cached)"""
+    summary = load_summary("tiktok")
+    return summary[summary['metric'].isin(STAT_COLUMNS)]
 
-def create_descriptive_table(df):
+def create_descriptive_table(summary):
     """Create descriptive statistics table"""
     
-    # Columns for statistics
-    stat_columns = [
-        'data.stats.collectCount',
-        'data.stats.commentCount', 
-        'data.stats.diggCount',
-        'data.stats.playCount',
-        'data.stats.shareCount'
-    ]
+    overall = summary[summary['party'] == ALL_PARTIES].set_index('metric')
+    by_party = summary[summary['party'] != ALL_PARTIES]
     
     # Create table for overall statistics
     overall_stats = pd.DataFrame()
     
-    for col in stat_columns:
+    for col in STAT_COLUMNS:
         col_clean_name = col.replace('data.stats.', '').replace('Count', '')
-        overall_stats.loc[col_clean_name, 'Mean'] = df[col].mean()
-        overall_stats.loc[col_clean_name, 'Median'] = df[col].median()
-        overall_stats.loc[col_clean_name, 'Std Dev'] = df[col].std()
-        overall_stats.loc[col_clean_name, 'Min'] = df[col].min()
-        overall_stats.loc[col_clean_name, 'Max'] = df[col].max()
-        overall_stats.loc[col_clean_name, 'Total'] = df[col].sum()
+        overall_stats.loc[col_clean_name, 'Mean'] = overall.loc[col, 'mean']
+        overall_stats.loc[col_clean_name, 'Median'] = overall.loc[col, 'median']
+        overall_stats.loc[col_clean_name, 'Std Dev'] = overall.loc[col, 'std']
+        overall_stats.loc[col_clean_name, 'Min'] = overall.loc[col, 'min']
+        overall_stats.loc[col_clean_name, 'Max'] = overall.loc[col, 'max']
+        overall_stats.loc[col_clean_name, 'Total'] = overall.loc[col, 'total']
     
     # Add general statistics
-    general_stats = pd.DataFrame()
-    general_stats.loc['Total Videos', 'Value'] = len(df)
-    general_stats.loc['Total Parties', 'Value'] = df['party'].nunique()
-    general_stats.loc['Date Range Start', 'Value'] = df['data.createTime'].min().strftime('%Y-%m-%d')
-    general_stats.loc['Date Range End', 'Value'] = df['data.createTime'].max().strftime('%Y-%m-%d')
+    general_stats = pd.DataFrame({'Value': pd.Series({
+        'Total Videos': float(overall['n_posts'].iloc[0]),
+        'Total Parties': float(by_party['party'].nunique()),
+        'Date Range Start': overall['first_post'].iloc[0].strftime('%Y-%m-%d'),
+        'Date Range End': overall['last_post'].iloc[0].strftime('%Y-%m-%d'),
+    }, dtype=object)})
     
     # Create party-level statistics
-    party_stats = df.groupby('party').agg({
-        'data.id': 'count',
-        'data.stats.playCount': ['mean', 'sum'],
-        'data.stats.diggCount': ['mean', 'sum'],
-        'data.stats.commentCount': ['mean', 'sum'],
-        'data.stats.shareCount': ['mean', 'sum'],
-        'data.stats.collectCount': ['mean', 'sum']
-    }).round(2)
-    
-    party_stats.columns = ['_'.join(col).strip() for col in party_stats.columns.values]
-    party_stats = party_stats.rename(columns={'data.id_count': 'Video Count'})
+    wide = by_party.pivot(index='party', columns='metric', values=['mean', 'total'])
+    party_stats = pd.DataFrame(index=wide.index)
+    party_stats['Video Count'] = by_party.groupby('party')['n_ids'].first()  # posts with a data.id
+    for col in ['data.stats.playCount', 'data.stats.diggCount', 'data.stats.commentCount',
+                'data.stats.shareCount', 'data.stats.collectCount']:
+        party_stats[f'{col}_mean'] = wide[('mean', col)]
+        party_stats[f'{col}_sum'] = wide[('total', col)]
+    party_stats = party_stats.round(2)
     
     return overall_stats, general_stats, party_stats
 
@@ -226,12 +211,12 @@ def create_pdf_table(overall_stats, general_stats, party_stats, output_path):
 
 def main():
     """Main execution function"""
-    print("Loading TikTok data from CSV files...")
-    df = load_all_data()
-    print(f"Loaded {len(df)} videos from {df['party'].nunique()} parties")
+    print("Loading TikTok summary from the clean store...")
+    summary = load_all_data()
     
     print("\nCreating descriptive statistics...")
-    overall_stats, general_stats, party_stats = create_descriptive_table(df)
+    overall_stats, general_stats, party_stats = create_descriptive_table(summary)
+    print(f"Loaded {general_stats.loc['Total Videos', 'Value']:.0f} videos from {general_stats.loc['Total Parties', 'Value']:.0f} parties")
     
     print("\nGenerating PDF table...")
     create_pdf_table(overall_stats, general_stats, party_stats, OUTPUT_PDF)